@@ -1,16 +1,43 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, PrivateAttr, model_validator
 from typing import List, Optional
+from functools import cached_property, lru_cache
 import secrets
 import os
-import json
+import orjson
+
+
+def _parse_cors_origins(raw: Optional[str]) -> List[str]:
+    v = raw.strip() if raw else ""
+    if not v or v == "*":
+        return ["*"]
+    # Try JSON array first
+    if v.startswith("["):
+        try:
+            parsed = orjson.loads(v)
+            if isinstance(parsed, list):
+                return [str(x).strip() for x in parsed if x]
+        except orjson.JSONDecodeError:
+            pass
+    # Fall back to comma-separated
+    return [x.strip() for x in v.split(",") if x.strip()]
+
+
+def _parse_extensions(raw: str) -> frozenset[str]:
+    exts = (ext.strip().lower() for ext in raw.split(","))
+    return frozenset(ext if ext.startswith(".") else f".{ext}" for ext in exts if ext)
 
 
 class Settings(BaseSettings):
     # Core
     environment: str = "production"
     debug: bool = False
-    secret_key: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
+    secret_key: Optional[str] = None
+    
+    @cached_property
+    def effective_secret_key(self) -> str:
+        """SECRET_KEY from env, or a random per-process key generated on first use."""
+        return self.secret_key or secrets.token_urlsafe(32)
     
     # Database - defaults allow container to start for health checks
     postgres_host: str = "postgres"
@@ -18,8 +45,10 @@ class Settings(BaseSettings):
     postgres_user: str = "ctfautopilot"
     postgres_password: str = "ctfautopilot"  # Default for dev, override in production
     postgres_db: str = "ctfautopilot"
+    # Disable when the schema is created offline (python -m app.database)
+    db_auto_create_schema: bool = True
     
-    @property
+    @cached_property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
     
@@ -28,13 +57,15 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_password: str = ""
     
-    @property
+    @cached_property
     def redis_url(self) -> str:
         auth = f":{self.redis_password}@" if self.redis_password else ""
         return f"redis://{auth}{self.redis_host}:{self.redis_port}/0"
     
     # Auth - simple default for local deployment
     admin_password: str = "admin"
+    # Argon2 hash of the admin password; takes precedence over admin_password
+    admin_password_hash: Optional[str] = None
     session_timeout_seconds: int = 3600
     
     # MegaLLM - optional, features disabled if not set
@@ -42,18 +73,22 @@ class Settings(BaseSettings):
     megallm_api_url: str = "https://ai.megallm.io/v1/chat/completions"
     megallm_model: str = "llama3.3-70b-instruct"
     
-    @property
+    @cached_property
     def llm_enabled(self) -> bool:
         return bool(self.megallm_api_key)
     
-    # Upload
+    # Upload - extensions stored as CSV (like CORS below) and tokenized once
     max_upload_size_mb: int = 200
     allowed_extensions: str = ".txt,.py,.c,.cpp,.h,.java,.js,.json,.xml,.html,.css,.md,.pdf,.png,.jpg,.jpeg,.gif,.zip,.tar,.gz,.pcap,.pcapng,.elf,.exe,.dll,.so,.bin"
     
+    _allowed_extensions: frozenset[str] = PrivateAttr(default_factory=frozenset)
+    
     @property
-    def allowed_extensions_list(self) -> List[str]:
-        return [ext.strip() for ext in self.allowed_extensions.split(",")]
+    def allowed_extensions_set(self) -> frozenset[str]:
+        """Lowercased, dot-prefixed extensions for O(1) membership checks."""
+        return self._allowed_extensions
     
+    # Not cached: max_upload_size_mb can be changed at runtime via PATCH /api/config
     @property
     def max_upload_size_bytes(self) -> int:
         return self.max_upload_size_mb * 1024 * 1024
@@ -71,7 +106,10 @@ class Settings(BaseSettings):
     # Data paths
     data_dir: str = "/data"
     
-    @property
+    # Self-update: how long a /system/check-update result is reused
+    update_check_ttl_seconds: int = 300
+    
+    @cached_property
     def runs_dir(self) -> str:
         return f"{self.data_dir}/runs"
     
@@ -79,22 +117,18 @@ class Settings(BaseSettings):
     # Supports: "*", "http://a,http://b", or '["http://a","http://b"]'
     cors_origins_raw: str = Field(default="*", validation_alias="CORS_ORIGINS")
 
+    _cors_origins: List[str] = PrivateAttr(default_factory=lambda: ["*"])
+
+    @model_validator(mode="after")
+    def _parse_raw_fields(self) -> "Settings":
+        """Tokenize string-encoded list settings once, at validation time."""
+        self._allowed_extensions = _parse_extensions(self.allowed_extensions)
+        self._cors_origins = _parse_cors_origins(self.cors_origins_raw)
+        return self
+
     @property
     def cors_origins(self) -> List[str]:
-        """Parse CORS origins from raw string."""
-        v = self.cors_origins_raw.strip() if self.cors_origins_raw else ""
-        if not v or v == "*":
-            return ["*"]
-        # Try JSON array first
-        if v.startswith("["):
-            try:
-                parsed = json.loads(v)
-                if isinstance(parsed, list):
-                    return [str(x).strip() for x in parsed if x]
-            except Exception:
-                pass
-        # Fall back to comma-separated
-        return [x.strip() for x in v.split(",") if x.strip()]
+        return self._cors_origins
 
     # TLS
     enable_tls: bool = False
@@ -104,7 +138,8 @@ class Settings(BaseSettings):
         env_file=None,
         case_sensitive=False,
         extra="ignore",
-        validate_default=True,
+        # Defaults are trusted literals; only validate values that come from env
+        validate_default=False,
     )
 
 
@@ -118,4 +153,10 @@ def _select_env_file() -> Optional[str]:
     return None
 
 
-settings = Settings(_env_file=_select_env_file())
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the process-wide Settings once; .env is parsed a single time."""
+    return Settings(_env_file=_select_env_file())
+
+
+settings = get_settings()
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, exists, inspect, literal_column, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
@@ -27,3 +30,72 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+def sync_create_schema(sync_conn) -> None:
+    """create_all, plus indexes added to tables that already existed."""
+    Base.metadata.create_all(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    sync_backfill_timeline(sync_conn)
+
+
+def _legacy_timeline_rows(job_id, timeline, fallback: datetime) -> list[dict]:
+    """Turn a legacy ``[{"timestamp": iso, "event": str}, ...]`` list into rows."""
+    rows = []
+    for entry in timeline if isinstance(timeline, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            timestamp = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            timestamp = fallback
+        rows.append({
+            "job_id": job_id,
+            "timestamp": timestamp,
+            "event": str(entry.get("event", "")),
+        })
+    return rows
+
+
+def sync_backfill_timeline(sync_conn) -> int:
+    """Copy the legacy jobs.timeline JSON column into timeline_events, once.
+    
+    Jobs that already have timeline_events rows are skipped, so this is safe
+    to re-run. Returns the number of events copied.
+    """
+    from app.models import Job, TimelineEvent
+    
+    if "timeline" not in {c["name"] for c in inspect(sync_conn).get_columns("jobs")}:
+        return 0
+    
+    legacy_timeline = literal_column("jobs.timeline", JSON)
+    result = sync_conn.execute(
+        select(Job.id, Job.created_at, legacy_timeline)
+        .where(legacy_timeline.is_not(None))
+        .where(~exists().where(TimelineEvent.job_id == Job.id))
+    )
+    rows = [
+        row
+        for job_id, created_at, timeline in result
+        for row in _legacy_timeline_rows(job_id, timeline, created_at or datetime.utcnow())
+    ]
+    if rows:
+        sync_conn.execute(TimelineEvent.__table__.insert(), rows)
+    return len(rows)
+
+
+async def create_schema():
+    """Create any missing tables. Run once offline via `python -m app.database`."""
+    import app.models  # noqa: F401 - registers the mapped tables on Base
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(sync_create_schema)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    import asyncio
+    
+    asyncio.run(create_schema())
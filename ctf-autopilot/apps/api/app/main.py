@@ -1,26 +1,55 @@
 # FastAPI Backend
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
+import importlib
+import logging
+import logging.config
 import asyncio
 import os
-import json
+import random
+import time
+import orjson
 
 from app.config import settings
 from app.middleware.security import SecurityHeadersMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
-from app.routers import auth, jobs, config, health, system, ai, history
-from app.routers import ws as ws_router
-from app.database import engine
+from app.middleware.cors import FastCORSMiddleware
+from app.database import engine, sync_create_schema
 from app.models import Base
 
 
+# ============================================================
+# Logging - configured once at import. Existing (uvicorn) loggers are kept.
+# ============================================================
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s [%(name)s] %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"},
+    },
+    "loggers": {
+        "app": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+})
+logger = logging.getLogger("app.startup")
+
+
 # ============================================================
 # Global state for tracking initialization (non-blocking)
 # ============================================================
 _db_ready = False
 _db_error: str | None = None
 
+# Bound once: the health endpoints are polled every few seconds
+_utcnow = datetime.utcnow
+
 
 def _parse_cors_origins_env(raw: str) -> list[str]:
     s = (raw or "").strip()
@@ -29,7 +58,7 @@ def _parse_cors_origins_env(raw: str) -> list[str]:
 
     if s.startswith("["):
         try:
-            parsed = json.loads(s)
+            parsed = orjson.loads(s)
             if isinstance(parsed, list):
                 return [str(x).strip() for x in parsed if str(x).strip()]
         except Exception:
@@ -39,27 +68,45 @@ def _parse_cors_origins_env(raw: str) -> list[str]:
     return [item.strip() for item in s.split(",") if item.strip()]
 
 
-def _read_dotenv_value(key: str) -> str | None:
-    """Read a value from a local .env file."""
+@lru_cache(maxsize=4)
+def _parse_dotenv_file(path: str, mtime_ns: int) -> dict[str, str]:
+    """Parse one .env file; keyed by mtime so edits to the file are picked up."""
+    values: dict[str, str] = {}
+    with open(path, "rb") as f:
+        for line in f.read().splitlines():
+            s = line.strip()
+            if s[:1] in (b"#", b"") or b"=" not in s:
+                continue
+            k, v = s.split(b"=", 1)
+            k = k.strip().decode("utf-8", "replace")
+            if k not in values:
+                values[k] = v.strip().strip(b'"').strip(b"'").decode("utf-8", "replace")
+    return values
+
+
+def _dotenv_map() -> dict[str, str]:
+    """Merge the local .env files into a dict (first occurrence wins)."""
+    values: dict[str, str] = {}
     for path in ("/app/.env", ".env"):
         try:
-            if not os.path.isfile(path):
-                continue
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    s = line.strip()
-                    if not s or s.startswith("#") or "=" not in s:
-                        continue
-                    k, v = s.split("=", 1)
-                    if k.strip() != key:
-                        continue
-                    v = v.strip().strip('"').strip("'")
-                    return v
+            st = os.stat(path)
+        except OSError:
+            continue
+        try:
+            parsed = _parse_dotenv_file(path, st.st_mtime_ns)
         except Exception:
             continue
-    return None
+        for k, v in parsed.items():
+            values.setdefault(k, v)
+    return values
+
+
+def _read_dotenv_value(key: str) -> str | None:
+    """Read a value from a local .env file."""
+    return _dotenv_map().get(key)
 
 
+@lru_cache(maxsize=1)
 def _get_effective_cors_origins() -> list[str]:
     env_v = os.getenv("CORS_ORIGINS")
     if env_v is not None and env_v.strip():
@@ -75,48 +122,153 @@ def _get_effective_cors_origins() -> list[str]:
         return ["*"]
 
 
+# CORS configuration is immutable for the process lifetime: resolve it once.
+EFFECTIVE_CORS_ORIGINS = _get_effective_cors_origins()
+if "*" in EFFECTIVE_CORS_ORIGINS:
+    EFFECTIVE_CORS_ORIGINS = ["*"]
+ALLOW_CREDENTIALS = "*" not in EFFECTIVE_CORS_ORIGINS
+
+
+async def _schema_is_current(conn) -> bool:
+    """Check in a single catalog query whether every mapped table and index exists.
+
+    create_all only ever creates missing tables, so once they are all present
+    it would just spend one round-trip per table finding nothing to do.
+    """
+    index_names = [i.name for t in Base.metadata.tables.values() for i in t.indexes]
+    result = await conn.execute(
+        text(
+            "SELECT (SELECT count(*) FROM information_schema.tables "
+            "WHERE table_schema = current_schema() AND table_name = ANY(:names)), "
+            "(SELECT count(*) FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND indexname = ANY(:indexes))"
+        ),
+        {"names": list(Base.metadata.tables), "indexes": index_names},
+    )
+    tables, indexes = result.one()
+    return tables == len(Base.metadata.tables) and indexes == len(index_names)
+
+
+async def _wait_for_db():
+    """Cheap readiness probe: a single round-trip, no schema work."""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+# Arbitrary constant identifying the schema-init advisory lock
+_SCHEMA_LOCK_KEY = 0x43544643
+
+
+async def _ensure_schema():
+    """Create missing tables, unless the schema is already in place.
+
+    With several workers or replicas starting together, only the holder of
+    a Postgres advisory lock runs create_all; the others wait on the lock,
+    re-check, and find the schema already current. The same locked pass
+    copies any legacy jobs.timeline JSON into timeline_events.
+    """
+    async with engine.begin() as conn:
+        if await _schema_is_current(conn):
+            return
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+        if not await _schema_is_current(conn):
+            await conn.run_sync(sync_create_schema)
+
+
 async def _init_database_background():
     """Initialize database in background - does NOT block app startup."""
     global _db_ready, _db_error
     
-    max_attempts = 60  # Try for up to 2 minutes
-    delay_seconds = 2
-
-    for attempt in range(1, max_attempts + 1):
+    # Exponential backoff with jitter so replicas restarting together don't
+    # retry in lockstep; the first retry fires after ~0.1s.
+    budget_seconds = 30.0
+    max_delay_seconds = 5.0
+    deadline = time.monotonic() + budget_seconds
+    attempt = 0
+    
+    # Log CORS config once, independent of how many DB attempts it takes
+    try:
+        logger.info(
+            "CORS_ORIGINS env=%r dotenv=%r effective=%r",
+            os.getenv("CORS_ORIGINS"), _read_dotenv_value("CORS_ORIGINS"), EFFECTIVE_CORS_ORIGINS,
+        )
+    except Exception:
+        pass
+    
+    while True:
+        attempt += 1
         try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
+            await _wait_for_db()
+            if settings.db_auto_create_schema:
+                await _ensure_schema()
             _db_ready = True
             _db_error = None
-            print(f"[startup] Database initialized successfully (attempt {attempt})")
-            
-            # Log CORS config
-            try:
-                dotenv_v = _read_dotenv_value("CORS_ORIGINS")
-                print(f"[startup] CORS_ORIGINS env={os.getenv('CORS_ORIGINS')!r} dotenv={dotenv_v!r} effective={_get_effective_cors_origins()!r}")
-            except Exception:
-                pass
+            logger.info("Database initialized successfully (attempt %d)", attempt)
             return
         except Exception as e:
             _db_error = str(e)
-            print(f"[startup] DB init attempt {attempt}/{max_attempts} failed: {e}")
-            if attempt < max_attempts:
-                await asyncio.sleep(delay_seconds)
+            logger.warning("DB init attempt %d failed: %s", attempt, e)
+        
+        delay = min(0.1 * 2 ** (attempt - 1), max_delay_seconds) + random.uniform(0, 0.25)
+        if time.monotonic() + delay > deadline:
+            break
+        await asyncio.sleep(delay)
     
-    print(f"[startup] WARNING: Database initialization failed after {max_attempts} attempts")
+    logger.error(
+        "Database initialization failed after %d attempts (%.0fs budget)",
+        attempt, budget_seconds,
+    )
+
+
+async def _expire_sessions_loop(interval_seconds: float = 60.0):
+    """Periodically bulk-delete expired sessions instead of per request."""
+    from app.routers.auth import purge_expired_sessions
+    
+    while True:
+        await asyncio.sleep(interval_seconds)
+        if not _db_ready:
+            continue
+        try:
+            removed = await purge_expired_sessions()
+            if removed:
+                logger.info("Purged %d expired sessions", removed)
+        except Exception as e:
+            logger.warning("Session cleanup failed: %s", e)
+
+
+# ============================================================
+# Lifespan - triggers background DB init (non-blocking)
+# ============================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background database initialization and session cleanup."""
+    tasks = (
+        asyncio.create_task(_init_database_background()),
+        asyncio.create_task(_expire_sessions_loop()),
+    )
+    yield
+    for task in tasks:
+        task.cancel()
+    await engine.dispose()
 
 
 # ============================================================
 # Create FastAPI app WITHOUT blocking lifespan
 # This ensures health check is available IMMEDIATELY
 # ============================================================
-app = FastAPI(
+_fastapi_kwargs = dict(
     title="CTF Autopilot Analyzer",
     description="Security-first CTF challenge analyzer and writeup generator",
     version="1.0.0",
-    docs_url="/api/docs" if settings.debug else None,
-    redoc_url="/api/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
+if settings.debug:
+    _fastapi_kwargs.update(docs_url="/api/docs", redoc_url="/api/redoc")
+else:
+    _fastapi_kwargs.update(docs_url=None, redoc_url=None)
+
+app = FastAPI(**_fastapi_kwargs)
 
 
 # ============================================================
@@ -131,37 +283,42 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _utcnow().isoformat(),
         "db_ready": _db_ready,
     }
 
 
+# Probes hit readiness every few seconds per pod; reuse the last ping briefly
+_READY_TTL_SECONDS = 2.0
+_last_ready: tuple[float, str] = (0.0, "")
+
+
 @app.get("/api/health/ready")
 async def readiness_check():
-    """Readiness check - returns ready only when DB is initialized."""
-    if _db_ready:
-        return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
-    else:
+    """Readiness check - ready once the DB is initialized and still answering."""
+    global _last_ready
+    
+    if not _db_ready:
         return {
             "status": "initializing",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utcnow().isoformat(),
             "error": _db_error,
         }
-
-
-# ============================================================
-# Startup event - triggers background DB init (non-blocking)
-# ============================================================
-@app.on_event("startup")
-async def on_startup():
-    """Start background database initialization."""
-    asyncio.create_task(_init_database_background())
-
-
-@app.on_event("shutdown")
-async def on_shutdown():
-    """Cleanup on shutdown."""
-    await engine.dispose()
+    
+    checked_at, db_status = _last_ready
+    if time.monotonic() - checked_at >= _READY_TTL_SECONDS:
+        try:
+            await _wait_for_db()
+            db_status = "connected"
+        except Exception as e:
+            db_status = f"error: {str(e)}"
+        _last_ready = (time.monotonic(), db_status)
+    
+    return {
+        "status": "ready" if db_status == "connected" else "not_ready",
+        "timestamp": _utcnow().isoformat(),
+        "database": db_status,
+    }
 
 
 # Security middleware
@@ -169,30 +326,51 @@ app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(RateLimitMiddleware)
 
 # CORS
-cors_origins = _get_effective_cors_origins()
-allow_credentials = True
-
-if any(origin == "*" for origin in cors_origins):
-    cors_origins = ["*"]
-    allow_credentials = False
-
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=allow_credentials,
+    FastCORSMiddleware,
+    allow_origins=EFFECTIVE_CORS_ORIGINS,
+    allow_credentials=ALLOW_CREDENTIALS,
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
 
 
-# REST API Routers
-app.include_router(health.router, prefix="/api", tags=["Health"])
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
-app.include_router(config.router, prefix="/api/config", tags=["Configuration"])
-app.include_router(system.router, prefix="/api/system", tags=["System"])
-app.include_router(ai.router, prefix="/api", tags=["AI Analysis"])
-app.include_router(history.router, prefix="/api", tags=["Analysis History"])
+# ============================================================
+# Routers - imported lazily so heavy dependencies (Celery, Docker, httpx)
+# are only loaded here, and a router with a broken import is skipped
+# instead of taking the whole API (and its health check) down.
+# ============================================================
+_ROUTERS = (
+    # (module, prefix, tags)
+    ("app.routers.health", "/api", ["Health"]),
+    ("app.routers.auth", "/api/auth", ["Authentication"]),
+    ("app.routers.jobs", "/api/jobs", ["Jobs"]),
+    ("app.routers.config", "/api/config", ["Configuration"]),
+    ("app.routers.system", "/api/system", ["System"]),
+    # Registered even without an LLM key: the AI endpoints fall back to
+    # rule-based analysis, which the web UI relies on.
+    ("app.routers.ai", "/api", ["AI Analysis"]),
+    ("app.routers.history", "/api", ["Analysis History"]),
+    # WebSocket Router
+    ("app.routers.ws", "/ws", ["WebSocket"]),
+)
+
+
+def _register_routers(app: FastAPI) -> None:
+    """Import and mount all API routers.
+
+    Runs once at import, before the app serves anything: Starlette compiles
+    each route's path regex when the route is created, so the full routing
+    table is built up front. Registration order is also match precedence,
+    so routes must not be re-sorted afterwards.
+    """
+    for module_name, prefix, tags in _ROUTERS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            logger.warning("Skipping router %s: %s", module_name, e)
+            continue
+        app.include_router(module.router, prefix=prefix, tags=tags)
+
 
-# WebSocket Router
-app.include_router(ws_router.router, prefix="/ws", tags=["WebSocket"])
+_register_routers(app)
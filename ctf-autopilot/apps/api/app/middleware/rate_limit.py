@@ -1,62 +1,87 @@
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from collections import defaultdict
-from datetime import datetime, timedelta
-import asyncio
+from collections import defaultdict, deque
+import time
 
 from app.config import settings
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
+    WINDOW_SECONDS = 60.0
+    # How often idle clients are dropped from self.requests
+    SWEEP_INTERVAL_SECONDS = 60.0
+    
     def __init__(self, app):
         super().__init__(app)
-        self.requests: dict = defaultdict(list)
-        self.lock = asyncio.Lock()
+        self.requests: dict = defaultdict(deque)
+        # (path prefix, method or None for any, limit) - first match wins
+        self._rules = (
+            ("/api/jobs", "POST", settings.rate_limit_uploads),
+            ("/api/auth/login", None, 5),  # Strict limit for login
+        )
+        self._default_limit = settings.rate_limit_api
+        self._next_sweep = time.monotonic() + self.SWEEP_INTERVAL_SECONDS
     
     async def dispatch(self, request: Request, call_next):
-        client_ip = self._get_client_ip(request)
+        # Resolved once per request and shared with downstream handlers
+        client_ip = getattr(request.state, "client_ip", None)
+        if client_ip is None:
+            client_ip = self._get_client_ip(request)
+            request.state.client_ip = client_ip
         path = request.url.path
         
         # Determine rate limit based on endpoint
-        if path.startswith("/api/jobs") and request.method == "POST":
-            limit = settings.rate_limit_uploads
-        elif path.startswith("/api/auth/login"):
-            limit = 5  # Strict limit for login
-        else:
-            limit = settings.rate_limit_api
+        limit = self._default_limit
+        for prefix, method, rule_limit in self._rules:
+            if path.startswith(prefix) and (method is None or method == request.method):
+                limit = rule_limit
+                break
+        
+        # Check rate limit (no await in this section, so it runs atomically
+        # with respect to other requests on the event loop)
+        now = time.monotonic()
+        window_start = now - self.WINDOW_SECONDS
+        
+        if now >= self._next_sweep:
+            self._sweep(window_start)
+            self._next_sweep = now + self.SWEEP_INTERVAL_SECONDS
         
-        # Check rate limit
-        async with self.lock:
-            now = datetime.utcnow()
-            window_start = now - timedelta(minutes=1)
-            
-            key = f"{client_ip}:{path}"
-            self.requests[key] = [
-                ts for ts in self.requests[key]
-                if ts > window_start
-            ]
-            
-            if len(self.requests[key]) >= limit:
-                return JSONResponse(
-                    status_code=429,
-                    content={
-                        "detail": "Too many requests. Please try again later.",
-                        "code": "RATE_LIMITED",
-                        "retry_after": 60,
-                    },
-                    headers={"Retry-After": "60"},
-                )
-            
-            self.requests[key].append(now)
+        key = (client_ip, path)
+        # Timestamps are appended in order, so expired ones are at the left
+        timestamps = self.requests[key]
+        while timestamps and timestamps[0] <= window_start:
+            timestamps.popleft()
+        
+        if len(timestamps) >= limit:
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "detail": "Too many requests. Please try again later.",
+                    "code": "RATE_LIMITED",
+                    "retry_after": 60,
+                },
+                headers={"Retry-After": "60"},
+            )
+        
+        timestamps.append(now)
         
         return await call_next(request)
     
+    def _sweep(self, window_start: float) -> None:
+        """Forget clients whose timestamps have all left the window."""
+        stale = [
+            key for key, timestamps in self.requests.items()
+            if not timestamps or timestamps[-1] <= window_start
+        ]
+        for key in stale:
+            del self.requests[key]
+    
     def _get_client_ip(self, request: Request) -> str:
         # Check for proxy headers
         forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
-            return forwarded.split(",")[0].strip()
+            return forwarded.partition(",")[0].strip()
         
         real_ip = request.headers.get("X-Real-IP")
         if real_ip:
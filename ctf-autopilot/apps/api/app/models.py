@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Float, JSON, Enum as SQLEnum, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Integer, Float, JSON, Enum as SQLEnum, ForeignKey, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,6 +18,12 @@ class JobStatus(str, enum.Enum):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination of list_jobs filtered by status
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+        # Unfiltered keyset pagination on (created_at, id)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(200), nullable=False)
@@ -26,7 +32,7 @@ class Job(Base):
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING)
     category = Column(String(50), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
@@ -34,10 +40,31 @@ class Job(Base):
     commands_executed = Column(Integer, default=0)
     
     error_message = Column(Text, nullable=True)
-    timeline = Column(JSON, default=list)
     
     # Relationships
     analysis_sessions = relationship("AnalysisSession", back_populates="job", cascade="all, delete-orphan")
+    timeline = relationship(
+        "TimelineEvent",
+        order_by="TimelineEvent.seq",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    # flag_candidates.job_id has no FK constraint, so spell out the join
+    flag_candidates = relationship(
+        "FlagCandidate",
+        primaryjoin="Job.id == foreign(FlagCandidate.job_id)",
+        viewonly=True,
+    )
+
+
+class TimelineEvent(Base):
+    """A single job timeline entry; appended with one INSERT per event."""
+    __tablename__ = "timeline_events"
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    event = Column(Text, nullable=False)
 
 
 class Command(Base):
@@ -45,7 +72,7 @@ class Command(Base):
     
     id = Column(String(50), primary_key=True)
     job_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    session_id = Column(UUID(as_uuid=True), ForeignKey("analysis_sessions.id"), nullable=True)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("analysis_sessions.id"), nullable=True, index=True)
     
     tool = Column(String(100), nullable=False)
     arguments = Column(JSON, default=list)
@@ -67,6 +94,9 @@ class Command(Base):
 
 class FlagCandidate(Base):
     __tablename__ = "flag_candidates"
+    __table_args__ = (
+        Index("ix_fc_job_verified", "job_id", "is_verified"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), nullable=False, index=True)
@@ -78,7 +108,7 @@ class FlagCandidate(Base):
     evidence_id = Column(String(50), nullable=True)
     context = Column(Text, nullable=True)
     
-    is_verified = Column(Boolean, default=False)
+    is_verified = Column(Boolean, default=False, index=True)
     verified_at = Column(DateTime, nullable=True)
     
     # Relationships
@@ -90,7 +120,8 @@ class Session(Base):
     
     id = Column(String(64), primary_key=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Still written for existing schemas; CSRF is now verified via HMAC(session id)
     csrf_token = Column(String(64), nullable=False)
 
 
@@ -130,7 +161,7 @@ class AnalysisSession(Base):
     
     # Relationships
     job = relationship("Job", back_populates="analysis_sessions")
-    commands = relationship("Command", back_populates="session")
+    commands = relationship("Command", back_populates="session", order_by="Command.started_at")
     flags_found = relationship("FlagCandidate", back_populates="session")
 
 
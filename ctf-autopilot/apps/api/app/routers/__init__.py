@@ -1,4 +1,4 @@
 # Routers package
-from app.routers import auth, config, health, jobs, ws, system, ai, history
+# Submodules are imported on demand by app.main._register_routers.
 
 __all__ = ["auth", "config", "health", "jobs", "ws", "system", "ai", "history"]
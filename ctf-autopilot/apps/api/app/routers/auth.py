@@ -1,48 +1,145 @@
-from fastapi import APIRouter, Response, HTTPException, Depends, Cookie
+from fastapi import APIRouter, Request, Response, HTTPException, Depends, Cookie
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from datetime import datetime, timedelta
+from typing import NamedTuple
+import hashlib
+import hmac
 import secrets
-import argon2
 
-from app.database import get_db
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import LRUCache, TTLCache
+
+from app.database import get_db, AsyncSessionLocal
 from app.config import settings
 from app.models import Session
 from app.schemas import LoginRequest, LoginResponse
 
 
 router = APIRouter()
-ph = argon2.PasswordHasher()
+
+
+class CachedSession(NamedTuple):
+    """The session fields auth needs, detached from the ORM."""
+    id: str
+    expires_at: datetime
+    csrf_token: str = ""
+
+
+# session_id -> CachedSession, so authenticated requests skip the SELECT.
+# Expiry is still checked on every hit; logout and expiry evict explicitly.
+_session_cache: TTLCache = TTLCache(
+    maxsize=10_000, ttl=min(60, settings.session_timeout_seconds)
+)
+
+
+_password_hasher = PasswordHasher()
+
+# sha256(password) -> Argon2 verify result. Keyed by digest so plaintext
+# attempts are never kept in memory; repeats skip the deliberately slow hash.
+_password_verify_cache: LRUCache = LRUCache(maxsize=32)
+
+
+def _csrf_for(session_id: str) -> str:
+    """Double-submit CSRF token derived from the session id (no DB lookup)."""
+    return hmac.new(
+        settings.effective_secret_key.encode(), session_id.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def _new_csrf_token(session_id: str) -> str:
+    """CSRF token for a new session.
+    
+    Without SECRET_KEY the HMAC key is random per process, so derived tokens
+    would break on restart and across workers; use a random token stored on
+    the session row instead.
+    """
+    if settings.secret_key:
+        return _csrf_for(session_id)
+    return secrets.token_hex(32)
+
+
+def _csrf_matches(session: CachedSession, csrf_token: str | None) -> bool:
+    expected = _csrf_for(session.id) if settings.secret_key else session.csrf_token
+    return bool(csrf_token and expected) and secrets.compare_digest(csrf_token, expected)
 
 
 def verify_password(password: str) -> bool:
-    """Verify password against stored admin password."""
-    return secrets.compare_digest(password, settings.admin_password)
+    """Verify password against stored admin password (or its Argon2 hash)."""
+    if not settings.admin_password_hash:
+        return secrets.compare_digest(password, settings.admin_password)
+    
+    key = hashlib.sha256(password.encode()).digest()
+    result = _password_verify_cache.get(key)
+    if result is None:
+        try:
+            result = _password_hasher.verify(settings.admin_password_hash, password)
+        except (VerificationError, InvalidHashError):
+            result = False
+        _password_verify_cache[key] = result
+    return result
+
+
+async def _load_session(db: AsyncSession, auth_session_id: str) -> CachedSession | None:
+    """Fetch a session, going through the in-process TTL cache."""
+    session = _session_cache.get(auth_session_id)
+    if session is None:
+        result = await db.execute(
+            select(Session.id, Session.expires_at, Session.csrf_token)
+            .where(Session.id == auth_session_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        session = _session_cache[auth_session_id] = CachedSession(*row)
+    return session
 
 
 async def get_current_session(
     auth_session_id: str = Cookie(None, alias="session_id"),
     db: AsyncSession = Depends(get_db),
-) -> Session:
+) -> CachedSession:
     """Verify session is valid and not expired."""
     if not auth_session_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    result = await db.execute(
-        select(Session).where(Session.id == auth_session_id)
-    )
-    session = result.scalar_one_or_none()
+    session = await _load_session(db, auth_session_id)
     
     if not session:
         raise HTTPException(status_code=401, detail="Invalid session")
     
+    # Expired rows are removed in bulk by purge_expired_sessions()
     if session.expires_at < datetime.utcnow():
-        await db.execute(delete(Session).where(Session.id == auth_session_id))
+        _session_cache.pop(auth_session_id, None)
         raise HTTPException(status_code=401, detail="Session expired")
     
     return session
 
 
+async def purge_expired_sessions(batch_size: int = 1000) -> int:
+    """Bulk-delete expired sessions in batches; returns the number removed.
+    
+    Each batch commits separately so a large backlog never holds row locks
+    on the sessions table for long.
+    """
+    now = datetime.utcnow()
+    removed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            batch = (
+                select(Session.id)
+                .where(Session.expires_at < now)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await db.execute(delete(Session).where(Session.id.in_(batch)))
+            await db.commit()
+            removed += result.rowcount
+            if result.rowcount < batch_size:
+                return removed
+
+
 async def optional_session(
     auth_session_id: str = Cookie(None, alias="session_id"),
     db: AsyncSession = Depends(get_db),
@@ -57,13 +154,11 @@ async def optional_session(
         return None
     
     try:
-        result = await db.execute(
-            select(Session).where(Session.id == auth_session_id)
-        )
-        session = result.scalar_one_or_none()
+        session = await _load_session(db, auth_session_id)
         
         if session and session.expires_at >= datetime.utcnow():
             return session
+        _session_cache.pop(auth_session_id, None)
     except Exception:
         pass
     
@@ -71,11 +166,11 @@ async def optional_session(
 
 
 def verify_csrf(
-    session: Session = Depends(get_current_session),
+    session: CachedSession = Depends(get_current_session),
     csrf_token: str = Cookie(None, alias="csrf_token"),
 ):
     """Verify CSRF token matches session."""
-    if not csrf_token or not secrets.compare_digest(csrf_token, session.csrf_token):
+    if not _csrf_matches(session, csrf_token):
         raise HTTPException(status_code=403, detail="Invalid CSRF token")
     return True
 
@@ -91,7 +186,7 @@ def optional_csrf(
     if session is None:
         return True
     
-    if csrf_token and secrets.compare_digest(csrf_token, session.csrf_token):
+    if _csrf_matches(session, csrf_token):
         return True
     
     # No session means no CSRF needed in single-user mode
@@ -99,7 +194,7 @@ def optional_csrf(
 
 
 async def require_auth(
-    session: Session = Depends(optional_session),
+    session: CachedSession = Depends(optional_session),
 ) -> None:
     """Auth dependency for v2.0.0 - always allows access (single-user mode).
     
@@ -122,7 +217,7 @@ async def login(
     
     # Create session
     session_id = secrets.token_urlsafe(32)
-    csrf_token = secrets.token_urlsafe(32)
+    csrf_token = _new_csrf_token(session_id)
     expires_at = datetime.utcnow() + timedelta(seconds=settings.session_timeout_seconds)
     
     session = Session(
@@ -157,6 +252,7 @@ async def logout(
 ):
     """End current session."""
     if session:
+        _session_cache.pop(session.id, None)
         await db.execute(delete(Session).where(Session.id == session.id))
     
     response.delete_cookie("session_id")
@@ -166,17 +262,36 @@ async def logout(
 
 
 @router.get("/me")
-async def get_current_user(session = Depends(optional_session)):
+async def get_current_user(
+    request: Request,
+    response: Response,
+    session = Depends(optional_session),
+):
     """Get current session info."""
     if session:
-        return {
+        body = {
             "authenticated": True,
             "expires_at": session.expires_at,
         }
+        identity = f"{session.id}|{session.expires_at.isoformat()}"
+    else:
+        # v2.0.0: Return success even without session (single-user mode)
+        body = {
+            "authenticated": True,
+            "mode": "single-user",
+            "message": "No login required in v2.0.0",
+        }
+        identity = "single-user"
     
-    # v2.0.0: Return success even without session (single-user mode)
-    return {
-        "authenticated": True,
-        "mode": "single-user",
-        "message": "No login required in v2.0.0",
+    # The answer depends on the session cookie: always revalidate, and let an
+    # unchanged identity come back as a bodiless 304
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "Vary": "Cookie",
+        "ETag": f'"{hashlib.sha256(identity.encode()).hexdigest()[:32]}"',
     }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return body
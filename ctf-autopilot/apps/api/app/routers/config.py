@@ -10,19 +10,20 @@ from app.services.sandbox_service import SandboxService
 
 router = APIRouter()
 
+# Class-level allowlist: read it without constructing a docker client
+_ALLOWED_TOOLS = SandboxService.allowed_tools
+
 
 @router.get("", response_model=ConfigResponse)
 async def get_config(
     _session = Depends(optional_session),
 ):
     """Get current configuration."""
-    sandbox_service = SandboxService()
-    
     return ConfigResponse(
         max_upload_size_mb=settings.max_upload_size_mb,
         sandbox_timeout_seconds=settings.sandbox_timeout_seconds,
-        allowed_extensions=settings.allowed_extensions_list,
-        allowed_tools=sandbox_service.allowed_tools,
+        allowed_extensions=sorted(settings.allowed_extensions_set),
+        allowed_tools=_ALLOWED_TOOLS,
     )
 
 
@@ -42,11 +43,9 @@ async def update_config(
     if config.sandbox_timeout_seconds:
         settings.sandbox_timeout_seconds = config.sandbox_timeout_seconds
     
-    sandbox_service = SandboxService()
-    
     return ConfigResponse(
         max_upload_size_mb=settings.max_upload_size_mb,
         sandbox_timeout_seconds=settings.sandbox_timeout_seconds,
-        allowed_extensions=settings.allowed_extensions_list,
-        allowed_tools=sandbox_service.allowed_tools,
+        allowed_extensions=sorted(settings.allowed_extensions_set),
+        allowed_tools=_ALLOWED_TOOLS,
     )
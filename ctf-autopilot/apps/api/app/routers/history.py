@@ -1,8 +1,8 @@
 """History API endpoints."""
 
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import AliasChoices, BaseModel, BeforeValidator, ConfigDict, Field
+from typing import Annotated, List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime
 
@@ -18,6 +18,10 @@ router = APIRouter(prefix="/history", tags=["Analysis History"])
 
 # ============ Request/Response Models ============
 
+# Nullable ORM counters/lists are coerced during from_attributes validation
+Count = Annotated[int, BeforeValidator(lambda v: v or 0)]
+StrList = Annotated[List[str], BeforeValidator(lambda v: v or [])]
+
 class CreateSessionRequest(BaseModel):
     job_id: str
     name: str = "Analysis Session"
@@ -62,23 +66,22 @@ class RecommendToolsRequest(BaseModel):
 
 
 class SessionResponse(BaseModel):
-    id: str
-    job_id: str
+    id: UUID
+    job_id: UUID
     name: str
     strategy: Optional[str]
     detected_category: Optional[str]
     status: str
     started_at: datetime
     ended_at: Optional[datetime]
-    total_commands: int
-    successful_commands: int
-    flags_found_count: int
-    ai_suggestions_used: int
+    total_commands: Count
+    successful_commands: Count
+    flags_found_count: Count
+    ai_suggestions_used: Count
     notes: Optional[str]
     summary: Optional[str]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SessionListResponse(BaseModel):
@@ -89,18 +92,24 @@ class SessionListResponse(BaseModel):
 class CommandSummary(BaseModel):
     id: str
     tool: str
-    arguments: List[str]
+    arguments: StrList
     exit_code: Optional[int]
-    stdout_preview: str
+    stdout_preview: Annotated[str, BeforeValidator(lambda v: (v or "")[:500])] = Field(
+        validation_alias=AliasChoices("stdout_preview", "stdout"),
+    )
     started_at: datetime
-    duration_ms: int
+    duration_ms: Count
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FlagSummary(BaseModel):
-    id: str
+    id: UUID
     value: str
     confidence: float
     source: Optional[str]
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SessionDetailResponse(BaseModel):
@@ -118,7 +127,7 @@ class ToolRecommendation(BaseModel):
 
 
 class SimilarSolveResponse(BaseModel):
-    id: str
+    id: UUID
     category: str
     file_types: List[str]
     successful_tools: List[str]
@@ -143,27 +152,17 @@ async def create_session(
             name=request.name,
             strategy=request.strategy,
         )
-        return SessionResponse(
-            id=str(session.id),
-            job_id=str(session.job_id),
-            name=session.name,
-            strategy=session.strategy,
-            detected_category=session.detected_category,
-            status=session.status,
-            started_at=session.started_at,
-            ended_at=session.ended_at,
-            total_commands=session.total_commands or 0,
-            successful_commands=session.successful_commands or 0,
-            flags_found_count=session.flags_found_count or 0,
-            ai_suggestions_used=session.ai_suggestions_used or 0,
-            notes=session.notes,
-            summary=session.summary,
-        )
+        return SessionResponse.model_validate(session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/sessions/{job_id}", response_model=SessionListResponse)
+# Null fields (notes, summary, ended_at, ...) are omitted from the larger payloads
+@router.get(
+    "/sessions/{job_id}",
+    response_model=SessionListResponse,
+    response_model_exclude_none=True,
+)
 async def get_job_sessions(
     job_id: str,
     limit: int = 20,
@@ -176,32 +175,18 @@ async def get_job_sessions(
             db, UUID(job_id), limit=limit
         )
         return SessionListResponse(
-            sessions=[
-                SessionResponse(
-                    id=str(s.id),
-                    job_id=str(s.job_id),
-                    name=s.name,
-                    strategy=s.strategy,
-                    detected_category=s.detected_category,
-                    status=s.status,
-                    started_at=s.started_at,
-                    ended_at=s.ended_at,
-                    total_commands=s.total_commands or 0,
-                    successful_commands=s.successful_commands or 0,
-                    flags_found_count=s.flags_found_count or 0,
-                    ai_suggestions_used=s.ai_suggestions_used or 0,
-                    notes=s.notes,
-                    summary=s.summary,
-                )
-                for s in sessions
-            ],
+            sessions=[SessionResponse.model_validate(s) for s in sessions],
             total=len(sessions),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/sessions/{job_id}/{session_id}", response_model=SessionDetailResponse)
+@router.get(
+    "/sessions/{job_id}/{session_id}",
+    response_model=SessionDetailResponse,
+    response_model_exclude_none=True,
+)
 async def get_session_details(
     job_id: str,
     session_id: str,
@@ -220,43 +205,9 @@ async def get_session_details(
         flags = details["flags"]
         
         return SessionDetailResponse(
-            session=SessionResponse(
-                id=str(session.id),
-                job_id=str(session.job_id),
-                name=session.name,
-                strategy=session.strategy,
-                detected_category=session.detected_category,
-                status=session.status,
-                started_at=session.started_at,
-                ended_at=session.ended_at,
-                total_commands=session.total_commands or 0,
-                successful_commands=session.successful_commands or 0,
-                flags_found_count=session.flags_found_count or 0,
-                ai_suggestions_used=session.ai_suggestions_used or 0,
-                notes=session.notes,
-                summary=session.summary,
-            ),
-            commands=[
-                CommandSummary(
-                    id=str(cmd.id),
-                    tool=cmd.tool,
-                    arguments=cmd.arguments or [],
-                    exit_code=cmd.exit_code,
-                    stdout_preview=(cmd.stdout or "")[:500],
-                    started_at=cmd.started_at,
-                    duration_ms=cmd.duration_ms or 0,
-                )
-                for cmd in commands
-            ],
-            flags=[
-                FlagSummary(
-                    id=str(flag.id),
-                    value=flag.value,
-                    confidence=flag.confidence,
-                    source=flag.source,
-                )
-                for flag in flags
-            ],
+            session=SessionResponse.model_validate(session),
+            commands=[CommandSummary.model_validate(cmd) for cmd in commands],
+            flags=[FlagSummary.model_validate(flag) for flag in flags],
             ai_insights=session.ai_insights or [],
             effective_tools=session.effective_tools or [],
         )
@@ -306,7 +257,7 @@ async def end_session(
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        return {"message": "Session ended", "session_id": str(session.id)}
+        return {"message": "Session ended", "session_id": session.id}
     except HTTPException:
         raise
     except Exception as e:
@@ -369,7 +320,7 @@ async def save_to_global_history(
             tool_sequence=request.tool_sequence,
             keywords=request.keywords,
         )
-        return {"message": "Saved to global history", "id": str(history.id)}
+        return {"message": "Saved to global history", "id": history.id}
     except HTTPException:
         raise
     except Exception as e:
@@ -406,7 +357,7 @@ async def get_similar_solves(
         )
         return [
             SimilarSolveResponse(
-                id=str(s.id),
+                id=s.id,
                 category=s.category,
                 file_types=s.file_types or [],
                 successful_tools=s.successful_tools or [],
@@ -1,27 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, exists, update, tuple_
+from sqlalchemy.orm import noload, selectinload
 from typing import List, Optional
 from datetime import datetime
+from functools import lru_cache
 from uuid import UUID
 from pathlib import Path
 from pydantic import BaseModel
-import zipfile
-import io
+import anyio
+import re
 import time
 
-from app.database import get_db
-from app.models import Job, Command, FlagCandidate, JobStatus
+from cachetools import TTLCache
+
+from app.database import get_db, AsyncSessionLocal
+from app.models import Job, Command, JobStatus, TimelineEvent
 from app.schemas import (
     JobCreate, JobSummary, JobDetail, JobListResponse,
     CommandListResponse, CommandResponse,
-    ArtifactListResponse, ArtifactInfo, FlagCandidateResponse,
+    ArtifactListResponse, ArtifactInfo,
 )
 from app.routers.auth import optional_session, optional_csrf
+from app.services.evidence_service import compiled_flag_pattern
 from app.services.file_service import FileService
 from app.services.job_service import JobService
-from app.services.sandbox_service import SandboxService
+from app.services.sandbox_service import get_sandbox_service
 from app.tasks import run_analysis_task
 
 
@@ -42,6 +47,16 @@ class TerminalCommandResponse(BaseModel):
 router = APIRouter()
 
 
+@lru_cache(maxsize=1)
+def get_file_service() -> FileService:
+    return FileService()
+
+
+async def _job_exists(db: AsyncSession, job_id: UUID) -> bool:
+    """Existence check without loading (or ORM-mapping) the job row."""
+    return await db.scalar(select(exists().where(Job.id == job_id)))
+
+
 @router.post("", status_code=201, response_model=JobSummary)
 async def create_job(
     title: str = Form(..., min_length=1, max_length=200),
@@ -49,18 +64,21 @@ async def create_job(
     flag_format: str = Form(default=r"CTF\{[^}]+\}"),
     files: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
     _csrf = Depends(optional_csrf),
 ):
     """Create a new analysis job."""
-    # Validate files
-    file_service = FileService()
-    validated_files = []
+    # Reject bad patterns up front; the compiled regex is cached for the worker
+    try:
+        compiled_flag_pattern(flag_format, re.IGNORECASE)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid flag_format regex: {e}")
     
+    # Validate files one at a time; each is streamed, not held in memory
     for file in files:
         try:
             await file_service.validate_file(file)
-            validated_files.append(file)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     
@@ -74,7 +92,7 @@ async def create_job(
     
     # Save files
     try:
-        file_paths = await file_service.save_files(job.id, validated_files)
+        file_paths = await file_service.save_files(job.id, files)
         job.input_files = file_paths
         await db.commit()
     except Exception as e:
@@ -84,64 +102,109 @@ async def create_job(
     return job
 
 
+def _encode_job_cursor(job: Job) -> str:
+    return f"{job.created_at.isoformat()}|{job.id}"
+
+
+def _decode_job_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Parse a list_jobs cursor into its (created_at, id) keyset position."""
+    try:
+        created_at, job_id = cursor.split("|")
+        return datetime.fromisoformat(created_at), UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _count_jobs(db: AsyncSession, status: Optional[JobStatus]) -> int:
+    """Number of jobs matching the list filter, ignoring any cursor."""
+    count_query = select(func.count()).select_from(Job)
+    if status:
+        count_query = count_query.where(Job.status == status)
+    return (await db.execute(count_query)).scalar()
+
+
 @router.get("", response_model=JobListResponse)
 async def list_jobs(
     status: Optional[JobStatus] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     _session = Depends(optional_session),
 ):
-    """List all jobs."""
-    query = select(Job).order_by(Job.created_at.desc())
+    """List all jobs.
+    
+    Pass the previous page's next_cursor as ``cursor`` for keyset paging,
+    which avoids scanning and discarding ``offset`` rows on deep pages.
+    ``total`` (all jobs matching ``status``, on every page) is only computed
+    with ``include_total=true``; otherwise ``has_more`` comes from fetching
+    one extra row.
+    """
+    # The window total would only count rows past the cursor, so cursor
+    # pages take the total from a separate COUNT instead
+    window_total = include_total and cursor is None
+    columns = [Job]
+    if window_total:
+        # count(*) OVER () returns the filtered total with each page row
+        columns.append(func.count().over().label("total"))
+    query = select(*columns).order_by(Job.created_at.desc(), Job.id.desc())
     
     if status:
         query = query.where(Job.status == status)
     
-    # Get total count
-    count_query = select(func.count()).select_from(Job)
-    if status:
-        count_query = count_query.where(Job.status == status)
-    total = (await db.execute(count_query)).scalar()
+    if cursor is not None:
+        query = query.where(tuple_(Job.created_at, Job.id) < _decode_job_cursor(cursor))
+        offset = 0
+    
+    query = query.offset(offset).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
-    # Get paginated results
-    query = query.offset(offset).limit(limit)
-    result = await db.execute(query)
-    jobs = result.scalars().all()
+    total = None
+    if window_total and rows:
+        total = rows[0].total
+    elif include_total and (cursor is not None or offset):
+        # Cursor page, or a page past the end with no row to carry the window total
+        total = await _count_jobs(db, status)
+    elif include_total:
+        total = 0
     
     return JobListResponse(
-        jobs=[JobSummary.model_validate(j) for j in jobs],
+        jobs=[JobSummary.model_validate(row.Job) for row in rows],
         total=total,
         limit=limit,
         offset=offset,
+        has_more=has_more,
+        next_cursor=_encode_job_cursor(rows[-1].Job) if has_more else None,
     )
 
 
 @router.get("/{job_id}", response_model=JobDetail)
 async def get_job(
     job_id: UUID,
+    include: List[str] = Query(default=[]),
     db: AsyncSession = Depends(get_db),
     _session = Depends(optional_session),
 ):
-    """Get job details."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
+    """Get job details.
+    
+    Flag candidates are only loaded with ``?include=flags``; status polls
+    skip that query and get an empty ``flag_candidates`` list.
+    """
+    flags = selectinload(Job.flag_candidates) if "flags" in include else noload(Job.flag_candidates)
+    result = await db.execute(
+        select(Job)
+        .where(Job.id == job_id)
+        .options(selectinload(Job.timeline), flags)
+    )
     job = result.scalar_one_or_none()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Get flag candidates
-    candidates_result = await db.execute(
-        select(FlagCandidate).where(FlagCandidate.job_id == job_id)
-    )
-    candidates = candidates_result.scalars().all()
-    
-    job_detail = JobDetail.model_validate(job)
-    job_detail.flag_candidates = [
-        FlagCandidateResponse.model_validate(c) for c in candidates
-    ]
-    
-    return job_detail
+    return JobDetail.model_validate(job)
 
 
 @router.post("/{job_id}/run", status_code=202)
@@ -153,59 +216,86 @@ async def run_job(
     _csrf = Depends(optional_csrf),
 ):
     """Start job execution."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    # Queue the job in one conditional UPDATE so concurrent runs can't both win
+    queued = await db.scalar(
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_([JobStatus.PENDING, JobStatus.FAILED]))
+        .values(status=JobStatus.QUEUED)
+        .returning(Job.id)
+    )
     
-    if job.status not in [JobStatus.PENDING, JobStatus.FAILED]:
+    if queued is None:
+        status = await db.scalar(select(Job.status).where(Job.id == job_id))
+        if status is None:
+            raise HTTPException(status_code=404, detail="Job not found")
         raise HTTPException(
             status_code=400,
-            detail=f"Job cannot be run in {job.status} status"
+            detail=f"Job cannot be run in {status} status"
         )
     
-    # Queue the job
-    job.status = JobStatus.QUEUED
-    job.timeline.append({
-        "timestamp": datetime.utcnow().isoformat(),
-        "event": "Job queued for execution"
-    })
-    await db.commit()
+    # The timeline is a child table, so the event is a plain INSERT
+    db.add(TimelineEvent(job_id=job_id, event="Job queued for execution"))
+    await db.flush()
+    _files_cache.pop(job_id, None)
     
-    # Trigger Celery task
-    run_analysis_task.delay(str(job_id))
+    # Publish only once the QUEUED status is durable, so a failed commit never
+    # leaves a worker running a job that was rolled back. Broker I/O blocks,
+    # so it runs in a thread.
+    await db.commit()
+    await anyio.to_thread.run_sync(run_analysis_task.delay, str(job_id))
     
     return {"message": "Job queued for execution", "status": "queued"}
 
 
-@router.get("/{job_id}/commands", response_model=CommandListResponse)
+@router.get("/{job_id}/commands", responses={200: {"model": CommandListResponse}})
 async def get_commands(
     job_id: UUID,
-    db: AsyncSession = Depends(get_db),
     _session = Depends(optional_session),
 ):
-    """Get executed commands."""
-    result = await db.execute(
+    """Get executed commands.
+    
+    Rows are streamed from a server-side cursor and encoded one at a time,
+    so jobs with thousands of large outputs are never buffered whole.
+    """
+    stmt = (
         select(Command)
         .where(Command.job_id == job_id)
         .order_by(Command.started_at)
+        .execution_options(yield_per=500)
     )
-    commands = result.scalars().all()
     
-    return CommandListResponse(
-        commands=[CommandResponse.model_validate(c) for c in commands]
-    )
+    # Own session: get_db's is closed before a streamed body is sent. The
+    # cursor is opened here so DB errors fail the request with a status
+    # instead of truncating an already-started 200 body.
+    db = AsyncSessionLocal()
+    try:
+        commands = await db.stream_scalars(stmt)
+    except BaseException:
+        await db.close()
+        raise
+    
+    async def body():
+        try:
+            yield b'{"commands":['
+            separator = b""
+            async for command in commands:
+                yield separator + CommandResponse.model_validate(command).model_dump_json().encode()
+                separator = b","
+            yield b"]}"
+        finally:
+            await db.close()
+    
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @router.get("/{job_id}/artifacts", response_model=ArtifactListResponse)
 async def get_artifacts(
     job_id: UUID,
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
 ):
     """List job artifacts."""
-    file_service = FileService()
     artifacts = await file_service.list_artifacts(job_id)
     
     return ArtifactListResponse(artifacts=artifacts)
@@ -215,10 +305,10 @@ async def get_artifacts(
 async def download_report(
     job_id: UUID,
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
 ):
     """Download generated writeup."""
-    file_service = FileService()
     report_path = file_service.get_report_path(job_id)
     
     if not report_path.exists():
@@ -235,27 +325,18 @@ async def download_report(
 async def download_bundle(
     job_id: UUID,
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
 ):
     """Download all artifacts as zip."""
-    file_service = FileService()
     job_dir = file_service.get_job_dir(job_id)
     
     if not job_dir.exists():
         raise HTTPException(status_code=404, detail="Job artifacts not found")
     
-    # Create zip in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file_path in job_dir.rglob("*"):
-            if file_path.is_file():
-                arcname = file_path.relative_to(job_dir)
-                zf.write(file_path, arcname)
-    
-    zip_buffer.seek(0)
-    
+    # Stream the zip as it is built (sync generator runs in the threadpool)
     return StreamingResponse(
-        zip_buffer,
+        file_service.iter_zip(job_dir),
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename=job_{job_id}_bundle.zip"
@@ -265,22 +346,27 @@ async def download_bundle(
 
 # ============ Terminal API ============
 
-@router.get("/{job_id}/files")
-async def get_job_files(
-    job_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    _session = Depends(optional_session),
-):
-    """List files available in job workspace."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    file_service = FileService()
-    job_dir = file_service.get_job_dir(job_id)
-    
+# Blocking filesystem walks below run in a worker thread (anyio.to_thread)
+# so slow volumes don't stall the event loop.
+
+# job_id -> (directory mtimes, file list). Directory mtimes only catch direct
+# entries changing, so the TTL bounds staleness for nested extracted files.
+_files_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+def _job_dirs_mtime(job_dir: Path) -> tuple:
+    """mtime_ns of the input/extracted dirs (0 when missing)."""
+    mtimes = []
+    for d in (job_dir / "input", job_dir / "extracted"):
+        try:
+            mtimes.append(d.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(0)
+    return tuple(mtimes)
+
+
+def _list_job_files(job_dir: Path) -> List[str]:
+    """List input files and extracted files (relative) for a job."""
     files = []
     
     # Get input files
@@ -298,6 +384,42 @@ async def get_job_files(
                 rel_path = f.relative_to(extracted_dir)
                 files.append(f"extracted/{rel_path}")
     
+    return files
+
+
+def _terminal_working_dir(job_dir: Path) -> Optional[Path]:
+    """Prefer the extracted directory if it has files, else the input dir."""
+    extracted_dir = job_dir / "extracted"
+    input_dir = job_dir / "input"
+    
+    if extracted_dir.exists() and any(extracted_dir.iterdir()):
+        return extracted_dir
+    if input_dir.exists():
+        return input_dir
+    return None
+
+
+@router.get("/{job_id}/files")
+async def get_job_files(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
+    _session = Depends(optional_session),
+):
+    """List files available in job workspace."""
+    if not await _job_exists(db, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    job_dir = file_service.get_job_dir(job_id)
+    
+    mtimes = await anyio.to_thread.run_sync(_job_dirs_mtime, job_dir)
+    cached = _files_cache.get(job_id)
+    if cached is not None and cached[0] == mtimes:
+        files = cached[1]
+    else:
+        files = await anyio.to_thread.run_sync(_list_job_files, job_dir)
+        _files_cache[job_id] = (mtimes, files)
+    
     return {"files": files}
 
 
@@ -306,34 +428,24 @@ async def execute_terminal_command(
     job_id: UUID,
     request: TerminalCommandRequest,
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
     _csrf = Depends(optional_csrf),
 ):
     """Execute a command in the sandbox terminal."""
     # Verify job exists
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    
-    if not job:
+    if not await _job_exists(db, job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Get working directory
-    file_service = FileService()
     job_dir = file_service.get_job_dir(job_id)
     
-    # Prefer extracted directory if it has files
-    extracted_dir = job_dir / "extracted"
-    input_dir = job_dir / "input"
-    
-    if extracted_dir.exists() and any(extracted_dir.iterdir()):
-        working_dir = extracted_dir
-    elif input_dir.exists():
-        working_dir = input_dir
-    else:
+    working_dir = await anyio.to_thread.run_sync(_terminal_working_dir, job_dir)
+    if working_dir is None:
         raise HTTPException(status_code=400, detail="No files found for this job")
     
     # Execute command
-    sandbox_service = SandboxService()
+    sandbox_service = get_sandbox_service()
     
     start_time = time.time()
     
@@ -373,17 +485,14 @@ async def download_artifact(
     job_id: UUID,
     artifact_path: str,
     db: AsyncSession = Depends(get_db),
+    file_service: FileService = Depends(get_file_service),
     _session = Depends(optional_session),
 ):
     """Download a specific artifact file."""
     # Verify job exists
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    
-    if not job:
+    if not await _job_exists(db, job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    file_service = FileService()
     job_dir = file_service.get_job_dir(job_id)
     
     # Security: prevent path traversal
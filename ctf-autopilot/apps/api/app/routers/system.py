@@ -2,12 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-import subprocess
+from typing import NamedTuple, Optional
+from functools import lru_cache
 import os
-import json
+import orjson
+import re
 import asyncio
 import shutil
+import time
 
 from app.routers.auth import optional_session, optional_csrf
 from app.config import settings
@@ -57,15 +59,21 @@ class ModelConfigResponse(BaseModel):
     extraction_model: str
 
 
-# In-memory storage for runtime config (persisted separately)
-_runtime_config = {
-    "api_key": None,
-    "analysis_model": "llama3.3-70b-instruct",
-    "writeup_model": "llama3.3-70b-instruct",
-    "extraction_model": "openai-gpt-oss-20b",
-}
+class RuntimeConfig(NamedTuple):
+    """Immutable runtime config snapshot; writers swap in a new one."""
+    api_key: Optional[str] = None
+    analysis_model: str = "llama3.3-70b-instruct"
+    writeup_model: str = "llama3.3-70b-instruct"
+    extraction_model: str = "openai-gpt-oss-20b"
+
 
+# In-memory storage for runtime config (persisted separately). Rebinding the
+# module global is atomic, so readers never see a half-applied update.
+_runtime_config = RuntimeConfig()
 
+
+# The install layout doesn't move at runtime, so both lookups are memoized
+@lru_cache(maxsize=1)
 def _find_install_dir() -> str:
     """Find the installation directory."""
     candidates = [
@@ -83,6 +91,7 @@ def _find_install_dir() -> str:
     return "/opt/ctf-compass"
 
 
+@lru_cache(maxsize=1)
 def _find_update_script() -> Optional[str]:
     """Find the update script path."""
     install_dir = _find_install_dir()
@@ -100,34 +109,57 @@ def _find_update_script() -> Optional[str]:
     return None
 
 
-def _get_current_version() -> str:
+def _reset_install_dir_cache() -> None:
+    """Forget the memoized install dir / update script (used by tests)."""
+    _find_install_dir.cache_clear()
+    _find_update_script.cache_clear()
+
+
+async def _get_current_version() -> str:
     """Get current installed version from git or VERSION file."""
     install_dir = _find_install_dir()
     
     try:
         # Try git first
-        result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            capture_output=True,
-            text=True,
-            cwd=install_dir,
-            timeout=10
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
+        code, out = await _git(install_dir, "rev-parse", "--short", "HEAD")
+        if code == 0:
+            return out
     except Exception:
         pass
     
     # Fallback to VERSION file
-    version_file = os.path.join(install_dir, "VERSION")
-    if os.path.exists(version_file):
-        with open(version_file) as f:
+    return await asyncio.to_thread(_read_version_file, install_dir) or "local-dev"
+
+
+def _read_version_file(install_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(install_dir, "VERSION")) as f:
             return f.read().strip()
+    except OSError:
+        return None
+
+
+async def _git(install_dir: str, *args: str, timeout: float = 10) -> tuple[int, str]:
+    """Run a git command without blocking the event loop.
     
-    return "local-dev"
+    Returns (code, stdout), or (code, stderr) when git exits non-zero.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=install_dir,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, (stdout if proc.returncode == 0 else stderr).decode().strip()
 
 
-def _check_for_updates() -> dict:
+async def _check_for_updates() -> dict:
     """Check for updates from GitHub."""
     install_dir = _find_install_dir()
     result = {
@@ -141,52 +173,48 @@ def _check_for_updates() -> dict:
     # Check if git is available
     if not shutil.which("git"):
         result["error"] = "Git not installed"
+        result["current_version"] = await _get_current_version()
         return result
     
     # Check if it's a git repo
     git_dir = os.path.join(install_dir, ".git")
     if not os.path.exists(git_dir):
         result["error"] = "Not a git repository"
+        result["current_version"] = await _get_current_version()
         return result
     
     try:
-        # Get current commit
-        proc = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            capture_output=True, text=True,
-            cwd=install_dir, timeout=10
+        # Read the local HEAD while probing the remote tip (ls-remote writes
+        # no refs or packs); the two are independent, so overlap them
+        (head_code, head), (code, out) = await asyncio.gather(
+            _git(install_dir, "rev-parse", "HEAD"),
+            _git(install_dir, "ls-remote", "--exit-code", "origin", "refs/heads/main", timeout=30),
         )
-        if proc.returncode == 0:
-            result["current_version"] = proc.stdout.strip()
+        if head_code == 0:
+            result["current_version"] = head[:7]
         
-        # Fetch from origin
-        subprocess.run(
-            ["git", "fetch", "origin", "main"],
-            capture_output=True, text=True,
-            cwd=install_dir, timeout=30
-        )
+        if code != 0:
+            # --exit-code exits 2, silently, when the branch is missing
+            result["error"] = (
+                "Branch main not found on origin" if code == 2 and not out
+                else f"Could not reach update remote: {out or f'git exited {code}'}"
+            )
+            return result
+        remote = out.split()[0]
+        result["latest_version"] = remote[:7]
         
-        # Get remote commit
-        proc = subprocess.run(
-            ["git", "rev-parse", "--short", "origin/main"],
-            capture_output=True, text=True,
-            cwd=install_dir, timeout=10
-        )
-        if proc.returncode == 0:
-            result["latest_version"] = proc.stdout.strip()
+        if remote == head:
+            return result
         
-        # Check if behind
-        proc = subprocess.run(
-            ["git", "rev-list", "--count", "HEAD..origin/main"],
-            capture_output=True, text=True,
-            cwd=install_dir, timeout=10
-        )
-        if proc.returncode == 0:
-            commits_behind = int(proc.stdout.strip())
+        # Only fetch when there is something to count
+        await _git(install_dir, "fetch", "origin", "main", timeout=30)
+        code, out = await _git(install_dir, "rev-list", "--count", "HEAD..FETCH_HEAD")
+        if code == 0:
+            commits_behind = int(out)
             result["commits_behind"] = commits_behind
             result["updates_available"] = commits_behind > 0
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         result["error"] = "Git operation timed out"
     except Exception as e:
         result["error"] = str(e)
@@ -194,12 +222,32 @@ def _check_for_updates() -> dict:
     return result
 
 
+# Each check runs git over the network; UI polls within the TTL reuse the
+# last result, and the lock makes concurrent misses share a single check
+_last_update_check: tuple[float, Optional[dict]] = (0.0, None)
+_update_check_lock = asyncio.Lock()
+
+
+def _update_check_is_fresh(checked_at: float, result: Optional[dict]) -> bool:
+    return result is not None and time.monotonic() - checked_at < settings.update_check_ttl_seconds
+
+
 @router.get("/check-update", response_model=UpdateCheckResponse)
 async def check_update(
+    force: bool = False,
     _session=Depends(optional_session),
 ):
-    """Check if updates are available."""
-    result = _check_for_updates()
+    """Check if updates are available (cached per settings unless force=true)."""
+    global _last_update_check
+    
+    checked_at, result = _last_update_check
+    if force or not _update_check_is_fresh(checked_at, result):
+        async with _update_check_lock:
+            checked_at, result = _last_update_check
+            # Another request may have refreshed it while we waited
+            if force or not _update_check_is_fresh(checked_at, result):
+                result = await _check_for_updates()
+                _last_update_check = (time.monotonic(), result)
     
     return UpdateCheckResponse(
         updates_available=result["updates_available"],
@@ -210,41 +258,53 @@ async def check_update(
     )
 
 
+_UPDATE_STREAM_BATCH_BYTES = 16 * 1024
+_UPDATE_STREAM_IDLE_FLUSH_SECONDS = 0.1
+_UPDATE_STREAM_URGENT_LEVELS = frozenset({"step", "error", "complete"})
+_UPDATE_STREAM_PING_SECONDS = 15.0
+
+
+def _sse_event(data: dict) -> bytes:
+    """Frame one progress message as a Server-Sent Events ``data:`` event."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
 async def _run_update_stream():
-    """Generator that streams update progress."""
+    """Generator that streams update progress as Server-Sent Events."""
+    global _last_update_check
     script_path = _find_update_script()
     install_dir = _find_install_dir()
     
     # Initial status
-    yield json.dumps({
+    yield _sse_event({
         "level": "info",
         "message": f"Starting update from {install_dir}...",
         "step": 0,
         "total": 6,
-    }) + "\n"
+    })
     
     if not script_path:
-        yield json.dumps({
+        yield _sse_event({
             "level": "error",
             "success": False,
             "message": "Update script not found. Please run manually:\nsudo bash /opt/ctf-compass/ctf-autopilot/infra/scripts/update.sh",
-        }) + "\n"
+        })
         return
     
-    yield json.dumps({
+    yield _sse_event({
         "level": "info",
         "message": f"Using script: {script_path}",
-    }) + "\n"
+    })
     
     # Check if we can execute the script
     # In Docker, we typically need to run the update outside the container
     in_docker = os.path.exists("/.dockerenv") or os.environ.get("DOCKER", "")
     
     if in_docker:
-        yield json.dumps({
+        yield _sse_event({
             "level": "warn",
             "message": "Running inside Docker container. Update will affect container only.",
-        }) + "\n"
+        })
     
     try:
         # Run the update script with JSON output
@@ -260,58 +320,84 @@ async def _run_update_stream():
         )
         
         step_count = 0
-        async for line in process.stdout:
-            decoded = line.decode().strip()
-            if not decoded:
+        # Batch chatty log lines into fewer sends. Step/error lines go out
+        # at once, and a partial batch is flushed whenever output pauses.
+        # Long silences (docker build) get an SSE comment so proxies keep
+        # the connection open.
+        buf = bytearray()
+        while True:
+            try:
+                line = await asyncio.wait_for(
+                    process.stdout.readline(),
+                    timeout=_UPDATE_STREAM_IDLE_FLUSH_SECONDS if buf else _UPDATE_STREAM_PING_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                yield bytes(buf) if buf else b": ping\n\n"
+                buf.clear()
                 continue
+            if not line:
+                break
             
-            # Try to parse as JSON
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Try to parse as JSON (orjson parses the raw bytes directly)
             try:
-                data = json.loads(decoded)
+                data = orjson.loads(line)
                 if data.get("level") == "step":
                     step_count += 1
                     data["step"] = step_count
                     data["total"] = 6
-                yield json.dumps(data) + "\n"
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # Plain text log
-                yield json.dumps({
+                data = {
                     "level": "log",
-                    "message": decoded,
-                }) + "\n"
+                    "message": line.decode(errors="replace"),
+                }
+            buf += _sse_event(data)
+            
+            if len(buf) >= _UPDATE_STREAM_BATCH_BYTES or data.get("level") in _UPDATE_STREAM_URGENT_LEVELS:
+                yield bytes(buf)
+                buf.clear()
+        
+        if buf:
+            yield bytes(buf)
         
         await process.wait()
         
         if process.returncode == 0:
-            yield json.dumps({
+            # The cached check now describes the pre-update tree
+            _last_update_check = (0.0, None)
+            yield _sse_event({
                 "level": "complete",
                 "success": True,
                 "message": "Update completed successfully! Services will restart.",
-            }) + "\n"
+            })
         else:
-            yield json.dumps({
+            yield _sse_event({
                 "level": "error",
                 "success": False,
                 "message": f"Update failed with exit code {process.returncode}",
-            }) + "\n"
+            })
             
     except asyncio.CancelledError:
-        yield json.dumps({
+        yield _sse_event({
             "level": "warn",
             "message": "Update cancelled",
-        }) + "\n"
+        })
     except PermissionError:
-        yield json.dumps({
+        yield _sse_event({
             "level": "error",
             "success": False,
             "message": "Permission denied. Run update manually with sudo:\nsudo bash " + (script_path or "update.sh"),
-        }) + "\n"
+        })
     except Exception as e:
-        yield json.dumps({
+        yield _sse_event({
             "level": "error",
             "success": False,
             "message": f"Update error: {str(e)}",
-        }) + "\n"
+        })
 
 
 @router.post("/update")
@@ -336,12 +422,12 @@ async def get_api_key_status(
     _session=Depends(optional_session),
 ):
     """Check if API key is configured."""
-    # Check environment variable first, then runtime config
-    env_key = settings.megallm_api_key
-    runtime_key = _runtime_config.get("api_key")
-    
-    key = runtime_key or env_key
-    
+    return _api_key_status(get_megallm_api_key())
+
+
+@lru_cache(maxsize=4)
+def _api_key_status(key: Optional[str]) -> ApiKeyResponse:
+    """Masked key status; keyed by the key itself, so rotation invalidates it."""
     if key and len(key) > 8:
         return ApiKeyResponse(
             is_configured=True,
@@ -351,6 +437,44 @@ async def get_api_key_status(
     return ApiKeyResponse(is_configured=False)
 
 
+# Serializes read-modify-write cycles on .env within this process
+_env_write_lock = asyncio.Lock()
+_API_KEY_LINE_RE = re.compile(r"^MEGALLM_API_KEY=.*$", re.M)
+
+
+def _write_env_atomic(env_file: str, api_key: str) -> None:
+    """Set MEGALLM_API_KEY in an existing .env via temp file + os.replace.
+    
+    A crash mid-write leaves either the old or the new file, never a torn one.
+    """
+    if not os.path.exists(env_file):
+        return
+    
+    with open(env_file, "r") as f:
+        content = f.read()
+    
+    # Update or add MEGALLM_API_KEY
+    entry = f"MEGALLM_API_KEY={api_key}"
+    content, found = _API_KEY_LINE_RE.subn(lambda _: entry, content, count=1)
+    if not found:
+        if content and not content.endswith("\n"):
+            content += "\n"
+        content += entry + "\n"
+    
+    tmp_file = f"{env_file}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_file, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(env_file, tmp_file)
+        os.replace(tmp_file, env_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+        raise
+
+
 @router.post("/api-key", response_model=ApiKeyResponse)
 async def set_api_key(
     request: ApiKeyUpdateRequest,
@@ -362,38 +486,21 @@ async def set_api_key(
         raise HTTPException(status_code=400, detail="Invalid API key")
     
     # Store in runtime config
-    _runtime_config["api_key"] = request.api_key
+    global _runtime_config
+    _runtime_config = _runtime_config._replace(api_key=request.api_key)
     
     # Try to persist to .env file
     install_dir = _find_install_dir()
     env_file = os.path.join(install_dir, ".env")
     
     try:
-        if os.path.exists(env_file):
-            with open(env_file, "r") as f:
-                lines = f.readlines()
-            
-            # Update or add MEGALLM_API_KEY
-            found = False
-            for i, line in enumerate(lines):
-                if line.startswith("MEGALLM_API_KEY="):
-                    lines[i] = f"MEGALLM_API_KEY={request.api_key}\n"
-                    found = True
-                    break
-            
-            if not found:
-                lines.append(f"MEGALLM_API_KEY={request.api_key}\n")
-            
-            with open(env_file, "w") as f:
-                f.writelines(lines)
+        async with _env_write_lock:
+            await asyncio.to_thread(_write_env_atomic, env_file, request.api_key)
     except Exception:
         # Runtime update only if file write fails
         pass
     
-    return ApiKeyResponse(
-        is_configured=True,
-        key_prefix=f"{request.api_key[:8]}...{request.api_key[-4:]}",
-    )
+    return _api_key_status(request.api_key)
 
 
 @router.get("/models", response_model=ModelConfigResponse)
@@ -401,10 +508,11 @@ async def get_model_config(
     _session=Depends(optional_session),
 ):
     """Get current model configuration."""
+    config = _runtime_config
     return ModelConfigResponse(
-        analysis_model=_runtime_config.get("analysis_model", "llama3.3-70b-instruct"),
-        writeup_model=_runtime_config.get("writeup_model", "llama3.3-70b-instruct"),
-        extraction_model=_runtime_config.get("extraction_model", "openai-gpt-oss-20b"),
+        analysis_model=config.analysis_model,
+        writeup_model=config.writeup_model,
+        extraction_model=config.extraction_model,
     )
 
 
@@ -415,17 +523,20 @@ async def set_model_config(
     _csrf=Depends(optional_csrf),
 ):
     """Update model configuration."""
-    if request.analysis_model:
-        _runtime_config["analysis_model"] = request.analysis_model
-    if request.writeup_model:
-        _runtime_config["writeup_model"] = request.writeup_model
-    if request.extraction_model:
-        _runtime_config["extraction_model"] = request.extraction_model
+    global _runtime_config
+    updates = {
+        field: value
+        for field in ("analysis_model", "writeup_model", "extraction_model")
+        if (value := getattr(request, field))
+    }
+    if updates:
+        _runtime_config = _runtime_config._replace(**updates)
     
+    config = _runtime_config
     return ModelConfigResponse(
-        analysis_model=_runtime_config.get("analysis_model", "llama3.3-70b-instruct"),
-        writeup_model=_runtime_config.get("writeup_model", "llama3.3-70b-instruct"),
-        extraction_model=_runtime_config.get("extraction_model", "openai-gpt-oss-20b"),
+        analysis_model=config.analysis_model,
+        writeup_model=config.writeup_model,
+        extraction_model=config.extraction_model,
     )
 
 
@@ -468,9 +579,9 @@ async def check_tool_availability(
     _session=Depends(optional_session),
 ):
     """Check which tools are installed in the sandbox."""
-    from app.services.sandbox_service import SandboxService
+    from app.services.sandbox_service import get_sandbox_service
     
-    sandbox = SandboxService()
+    sandbox = get_sandbox_service()
     result = await sandbox.check_tool_availability(force_refresh=refresh)
     
     return ToolAvailabilityResponse(**result)
@@ -481,9 +592,9 @@ async def get_python_packages(
     _session=Depends(optional_session),
 ):
     """Get list of pre-installed Python packages in sandbox."""
-    from app.services.sandbox_service import SandboxService
+    from app.services.sandbox_service import get_sandbox_service
     
-    sandbox = SandboxService()
+    sandbox = get_sandbox_service()
     packages = sandbox.get_installed_python_packages()
     
     return PythonPackagesResponse(
@@ -500,12 +611,12 @@ async def run_python_script(
     _csrf=Depends(optional_csrf),
 ):
     """Run a Python script in the sandbox."""
-    from app.services.sandbox_service import SandboxService
     from uuid import uuid4
     from pathlib import Path
     import tempfile
+    from app.services.sandbox_service import get_sandbox_service
     
-    sandbox = SandboxService()
+    sandbox = get_sandbox_service()
     
     # Create temp working directory
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -530,15 +641,16 @@ async def run_python_script(
 
 def get_megallm_api_key() -> Optional[str]:
     """Get the current MegaLLM API key (runtime or env)."""
-    return _runtime_config.get("api_key") or settings.megallm_api_key
+    return _runtime_config.api_key or settings.megallm_api_key
+
+
+_TASK_MODEL_FIELDS = {
+    "analysis": "analysis_model",
+    "writeup": "writeup_model",
+    "extraction": "extraction_model",
+}
 
 
 def get_model_for_task(task: str) -> str:
     """Get the configured model for a specific task."""
-    task_map = {
-        "analysis": "analysis_model",
-        "writeup": "writeup_model",
-        "extraction": "extraction_model",
-    }
-    key = task_map.get(task, "analysis_model")
-    return _runtime_config.get(key, "llama3.3-70b-instruct")
+    return getattr(_runtime_config, _TASK_MODEL_FIELDS.get(task, "analysis_model"))
@@ -1,5 +1,5 @@
 """WebSocket router for real-time job updates."""
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
+from fastapi import APIRouter, WebSocket, Depends, Query
 from typing import Optional
 
 from app.websocket import get_ws_manager, ConnectionManager
@@ -8,6 +8,18 @@ from app.websocket import get_ws_manager, ConnectionManager
 router = APIRouter()
 
 
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Block until the client goes away.
+    
+    Keep-alive is done with protocol Ping/Pong frames by uvicorn
+    (--ws-ping-interval), so client frames are drained without decoding.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
 @router.websocket("/jobs")
 async def websocket_all_jobs(
     websocket: WebSocket,
@@ -24,14 +36,7 @@ async def websocket_all_jobs(
     await manager.connect_global(websocket)
     
     try:
-        while True:
-            # Keep connection alive, handle ping/pong
-            data = await websocket.receive_text()
-            
-            # Handle client messages (ping, etc.)
-            if data == "ping":
-                await websocket.send_text("pong")
-    except WebSocketDisconnect:
+        await _wait_for_disconnect(websocket)
         await manager.disconnect_global(websocket)
     except Exception as e:
         print(f"[WS] Error in global connection: {e}")
@@ -56,12 +61,7 @@ async def websocket_job(
     await manager.connect_job(websocket, job_id)
     
     try:
-        while True:
-            data = await websocket.receive_text()
-            
-            if data == "ping":
-                await websocket.send_text("pong")
-    except WebSocketDisconnect:
+        await _wait_for_disconnect(websocket)
         await manager.disconnect_job(websocket, job_id)
     except Exception as e:
         print(f"[WS] Error in job {job_id} connection: {e}")
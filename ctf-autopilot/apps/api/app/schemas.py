@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
@@ -36,6 +36,8 @@ class JobCreate(BaseModel):
 class TimelineEvent(BaseModel):
     timestamp: datetime
     event: str
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobSummary(BaseModel):
@@ -45,8 +47,7 @@ class JobSummary(BaseModel):
     created_at: datetime
     completed_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FlagCandidateResponse(BaseModel):
@@ -55,8 +56,7 @@ class FlagCandidateResponse(BaseModel):
     source: str
     evidence_id: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobDetail(BaseModel):
@@ -74,15 +74,18 @@ class JobDetail(BaseModel):
     timeline: List[TimelineEvent]
     flag_candidates: List[FlagCandidateResponse] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobListResponse(BaseModel):
     jobs: List[JobSummary]
-    total: int
+    # Only set with include_total: all jobs matching the status filter, on every page
+    total: Optional[int] = None
     limit: int
     offset: int
+    has_more: bool = False
+    # Opaque "<created_at>|<id>" keyset position of the last row
+    next_cursor: Optional[str] = None
 
 
 # Commands
@@ -97,8 +100,7 @@ class CommandResponse(BaseModel):
     stderr: str
     output_hash: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CommandListResponse(BaseModel):
@@ -10,6 +10,41 @@ import re
 from app.config import settings
 
 
+# Flag-like tokens: the generic PREFIX{...} shape, plus flag{...}/CTF{...} of any length
+_FLAG_RE = re.compile(
+    r'[A-Z]{2,10}\{[^}]{1,100}\}|(?:flag|CTF)\{[^}]+\}',
+    re.IGNORECASE,
+)
+_B64_LINE_RE = re.compile(r'^[A-Za-z0-9+/]{20,}={0,2}$', re.MULTILINE)
+
+
+def _compile_category_patterns(patterns: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Pre-lowercase signatures and turn extensions into sets, once per process."""
+    return {
+        category: {
+            'extensions': frozenset(p['extensions']),
+            'file_signatures': tuple(sig.lower() for sig in p['file_signatures']),
+        }
+        for category, p in patterns.items()
+    }
+
+
+def _compile_strings_hints(patterns: Dict[str, Dict]) -> Tuple[re.Pattern, Dict[str, List[str]]]:
+    """One regex for every strings hint, plus hint -> categories.
+    
+    The lookahead lets hints overlap (``RSA`` inside ``BEGIN RSA``) so a single
+    ``finditer`` pass sees the same hints the per-hint substring checks did.
+    """
+    hint_categories: Dict[str, List[str]] = {}
+    for category, p in patterns.items():
+        for hint in p['strings_hints']:
+            hint_categories.setdefault(hint, []).append(category)
+    alternation = "|".join(
+        map(re.escape, sorted(hint_categories, key=len, reverse=True))
+    )
+    return re.compile(f"(?=({alternation}))"), hint_categories
+
+
 class AIAnalysisService:
     """Service for AI-powered CTF analysis using MegaLLM API."""
     
@@ -52,6 +87,9 @@ class AIAnalysisService:
         },
     }
     
+    _CATEGORY_LOOKUP = _compile_category_patterns(CATEGORY_PATTERNS)
+    _STRINGS_HINT_RE, _HINT_CATEGORIES = _compile_strings_hints(CATEGORY_PATTERNS)
+    
     ANALYST_SYSTEM_PROMPT = """You are an expert CTF (Capture The Flag) analyst. Your job is to analyze command outputs and determine the best next steps to find the flag.
 
 CRITICAL RULES:
@@ -169,23 +207,24 @@ Analyze the outputs and suggest 1-3 specific commands to try next. Focus on find
         
         for filename in files:
             ext = Path(filename).suffix.lower()
-            file_output = file_outputs.get(filename, "")
+            file_output = file_outputs.get(filename, "").lower()
             strings_output = strings_outputs.get(filename, "")
             
-            for category, patterns in self.CATEGORY_PATTERNS.items():
+            for category, patterns in self._CATEGORY_LOOKUP.items():
                 # Check extension
                 if ext in patterns['extensions']:
                     scores[category] += 2.0
                 
                 # Check file signature
                 for sig in patterns['file_signatures']:
-                    if sig.lower() in file_output.lower():
+                    if sig in file_output:
                         scores[category] += 1.5
-                
-                # Check strings hints
-                for hint in patterns['strings_hints']:
-                    if hint in strings_output:
-                        scores[category] += 0.5
+            
+            # Check strings hints: one scan, each distinct hint scores once
+            hints = {m.group(1) for m in self._STRINGS_HINT_RE.finditer(strings_output)}
+            for hint in hints:
+                for category in self._HINT_CATEGORIES[hint]:
+                    scores[category] += 0.5
         
         # Get best category
         if not any(scores.values()):
@@ -267,21 +306,15 @@ Stderr:
             output = cmd.get('stdout', '')
             
             # Look for flags
-            flag_patterns = [
-                r'[A-Z]{2,10}\{[^}]{1,100}\}',
-                r'flag\{[^}]+\}',
-                r'CTF\{[^}]+\}',
-            ]
-            for pattern in flag_patterns:
-                matches = re.findall(pattern, output, re.IGNORECASE)
-                flag_candidates.extend(matches)
+            flag_candidates.extend(_FLAG_RE.findall(output))
             
             # Look for interesting patterns
-            if 'base64' in output.lower() or re.search(r'^[A-Za-z0-9+/]{20,}={0,2}$', output, re.MULTILINE):
+            output_lower = output.lower()
+            if 'base64' in output_lower or _B64_LINE_RE.search(output):
                 findings.append("Detected base64 encoded data")
-            if 'password' in output.lower():
+            if 'password' in output_lower:
                 findings.append("Found password reference")
-            if 'hidden' in output.lower():
+            if 'hidden' in output_lower:
                 findings.append("Found 'hidden' keyword")
         
         # Generate next commands based on category and attempt
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict
 from uuid import UUID
@@ -7,6 +8,12 @@ import json
 from app.config import settings
 
 
+@lru_cache(maxsize=256)
+def compiled_flag_pattern(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile a flag regex once per (pattern, flags); raises re.error if invalid."""
+    return re.compile(pattern, flags)
+
+
 class EvidenceService:
     """Service for extracting evidence and flag candidates."""
     
@@ -32,12 +39,12 @@ class EvidenceService:
         patterns = []
         if custom_pattern:
             try:
-                patterns.append(re.compile(custom_pattern, re.IGNORECASE))
+                patterns.append(compiled_flag_pattern(custom_pattern, re.IGNORECASE))
             except re.error:
                 pass
         
         for pattern_str in self.default_flag_patterns:
-            patterns.append(re.compile(pattern_str))
+            patterns.append(compiled_flag_pattern(pattern_str))
         
         for result in command_results:
             stdout = result.get("stdout", "")
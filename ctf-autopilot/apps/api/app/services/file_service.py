@@ -1,20 +1,86 @@
 from fastapi import UploadFile
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from uuid import UUID
+import anyio
+import asyncio
 import mimetypes
 import hashlib
 import zipfile
 import os
+import queue
 import re
+import shutil
+import threading
 
 from app.config import settings
 from app.schemas import ArtifactInfo
 
 
+class _ZipChunkSink:
+    """Write-only sink that hands zipfile output to a consumer in chunks.
+    
+    It deliberately has no tell()/seek(), so zipfile treats it as
+    unseekable and writes data descriptors instead of patching headers.
+    The queue is bounded, so the writer waits for a slow consumer.
+    """
+    
+    def __init__(self, chunk_size: int, max_chunks: int = 4):
+        self._buf = bytearray()
+        self._chunk_size = chunk_size
+        self.chunks: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self.closed = threading.Event()
+    
+    def write(self, data) -> int:
+        self._buf += data
+        if len(self._buf) >= self._chunk_size:
+            self.flush()
+        return len(data)
+    
+    def flush(self) -> None:
+        if self._buf:
+            self.put(bytes(self._buf))
+            self._buf.clear()
+    
+    def put(self, item) -> None:
+        # Stop waiting once the consumer is gone (client disconnected)
+        while not self.closed.is_set():
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise BrokenPipeError("zip consumer closed")
+
+
+def _walk_files(root: str) -> Iterator[str]:
+    """Yield regular files under root; DirEntry type checks need no extra stat."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+
 class FileService:
     """Service for handling file uploads and storage."""
     
+    SAVE_CONCURRENCY = 8
+    # Read/write chunk for uploads and bundles: bounds per-file memory
+    IO_CHUNK_SIZE = 1024 * 1024
+    ZIP_COMPRESS_LEVEL = 1
+    # Already-compressed formats: deflating them again only burns CPU
+    ZIP_STORED_SUFFIXES = frozenset({
+        ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+        ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".webm",
+        ".pdf",
+        # Zip containers
+        ".jar", ".apk", ".docx", ".xlsx", ".pptx", ".odt",
+    })
+    
     DANGEROUS_PATTERNS = [
         r'\.\./',          # Path traversal
         r'\.\.\\',         # Windows path traversal
@@ -35,18 +101,19 @@ class FileService:
         
         # Check extension
         ext = Path(safe_name).suffix.lower()
-        if ext not in settings.allowed_extensions_list:
+        if ext not in settings.allowed_extensions_set:
             raise ValueError(f"File type not allowed: {ext}")
         
-        # Check size
-        content = await file.read()
+        # Check size chunk by chunk, so the upload is never held in memory
+        size = 0
+        while chunk := await file.read(self.IO_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.max_upload_size_bytes:
+                raise ValueError(
+                    f"File too large. Maximum size: {settings.max_upload_size_mb}MB"
+                )
         await file.seek(0)  # Reset for later reading
         
-        if len(content) > settings.max_upload_size_bytes:
-            raise ValueError(
-                f"File too large. Maximum size: {settings.max_upload_size_mb}MB"
-            )
-        
         # Verify MIME type matches extension (basic check)
         mime_type, _ = mimetypes.guess_type(safe_name)
         file_mime = file.content_type
@@ -89,25 +156,39 @@ class FileService:
         # Set restrictive permissions
         os.chmod(input_dir, 0o700)
         
-        saved_files = []
-        
-        for file in files:
-            safe_name = self.sanitize_filename(file.filename)
-            file_path = input_dir / safe_name
-            
-            content = await file.read()
-            file_path.write_bytes(content)
-            
-            # Restrictive file permissions
-            os.chmod(file_path, 0o600)
-            
-            saved_files.append(safe_name)
-            
-            # Extract zip files
+        # Resolve target names first. A repeated name keeps only its last
+        # upload (as the old sequential loop did), so no two writers race
+        # on one path.
+        names = [self.sanitize_filename(file.filename) for file in files]
+        latest = {}
+        for name, file in zip(names, files):
+            latest.pop(name, None)
+            latest[name] = file
+        
+        # Overlap the copies, but cap how many files are open at once. Each
+        # copy streams in IO_CHUNK_SIZE pieces, so uploads are never read whole.
+        limit = asyncio.Semaphore(self.SAVE_CONCURRENCY)
+        
+        async def save_one(safe_name: str, file: UploadFile) -> None:
+            async with limit:
+                await anyio.to_thread.run_sync(self._copy_private, file.file, input_dir / safe_name)
+        
+        await asyncio.gather(*(save_one(name, file) for name, file in latest.items()))
+        
+        # Archives share one extraction directory: extract them one at a
+        # time, in upload order, so later archives overwrite earlier ones
+        for safe_name in latest:
             if safe_name.endswith('.zip'):
-                await self._safe_extract_zip(file_path, job_dir / "extracted")
+                await self._safe_extract_zip(input_dir / safe_name, job_dir / "extracted")
         
-        return saved_files
+        return names
+    
+    def _copy_private(self, src, file_path: Path) -> None:
+        src.seek(0)
+        with open(file_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, self.IO_CHUNK_SIZE)
+        # Restrictive file permissions
+        os.chmod(file_path, 0o600)
     
     async def _safe_extract_zip(self, zip_path: Path, dest: Path) -> None:
         """Safely extract zip file, preventing zip-slip attacks."""
@@ -146,6 +227,52 @@ class FileService:
         """Get job directory path."""
         return Path(settings.runs_dir) / str(job_id)
     
+    def iter_zip(self, root: Path) -> Iterator[bytes]:
+        """Yield a zip archive of every file under root, chunk by chunk.
+        
+        A worker thread builds the archive with ZipFile.write(), which sets
+        compression per entry; peak memory is a few read chunks, not the
+        whole archive.
+        """
+        sink = _ZipChunkSink(self.IO_CHUNK_SIZE)
+        worker = threading.Thread(target=self._write_zip, args=(root, sink), daemon=True)
+        worker.start()
+        try:
+            while (item := sink.chunks.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            sink.closed.set()
+            worker.join()
+    
+    def _write_zip(self, root: Path, sink: _ZipChunkSink) -> None:
+        """Write the archive for iter_zip into sink, then a None sentinel."""
+        try:
+            with zipfile.ZipFile(sink, "w") as zf:
+                for file_path in _walk_files(str(root)):
+                    stored = os.path.splitext(file_path)[1].lower() in self.ZIP_STORED_SUFFIXES
+                    try:
+                        zf.write(
+                            file_path,
+                            os.path.relpath(file_path, root),
+                            compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED,
+                            compresslevel=None if stored else self.ZIP_COMPRESS_LEVEL,
+                        )
+                    except FileNotFoundError:
+                        # Removed by a running job after the walk saw it;
+                        # nothing of it was written yet, so skip it
+                        continue
+            sink.flush()
+            sink.put(None)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            try:
+                sink.put(e)
+            except BrokenPipeError:
+                pass
+    
     def get_report_path(self, job_id: UUID) -> Path:
         """Get report file path."""
         return self.get_job_dir(job_id) / "report.md"
@@ -7,6 +7,7 @@ import json
 
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.models import AnalysisSession, GlobalSolveHistory, Command, FlagCandidate
 
@@ -122,31 +123,34 @@ class HistoryService:
     ) -> Optional[Dict]:
         """Get detailed session info including commands and flags."""
         result = await db.execute(
-            select(AnalysisSession).where(AnalysisSession.id == session_id)
+            select(AnalysisSession)
+            .where(AnalysisSession.id == session_id)
+            .options(selectinload(AnalysisSession.flags_found))
         )
         session = result.scalar_one_or_none()
         
         if not session:
             return None
         
-        # Get commands
-        cmd_result = await db.execute(
-            select(Command)
+        # Lightweight rows: stdout can be megabytes, so truncate it in SQL
+        commands = await db.execute(
+            select(
+                Command.id,
+                Command.tool,
+                Command.arguments,
+                Command.exit_code,
+                func.substr(Command.stdout, 1, 500).label("stdout_preview"),
+                Command.started_at,
+                Command.duration_ms,
+            )
             .where(Command.session_id == session_id)
             .order_by(Command.started_at)
         )
-        commands = list(cmd_result.scalars().all())
-        
-        # Get flags
-        flag_result = await db.execute(
-            select(FlagCandidate).where(FlagCandidate.session_id == session_id)
-        )
-        flags = list(flag_result.scalars().all())
         
         return {
             "session": session,
-            "commands": commands,
-            "flags": flags,
+            "commands": list(commands.all()),
+            "flags": list(session.flags_found),
         }
     
     async def add_ai_insight(
@@ -1,8 +1,9 @@
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from uuid import UUID
 
-from app.models import Job, JobStatus
+from app.models import Job, JobStatus, TimelineEvent
 
 
 class JobService:
@@ -23,10 +24,7 @@ class JobService:
             description=description,
             flag_format=flag_format,
             status=JobStatus.PENDING,
-            timeline=[{
-                "timestamp": datetime.utcnow().isoformat(),
-                "event": "Job created",
-            }],
+            timeline=[TimelineEvent(event="Job created")],
         )
         
         self.db.add(job)
@@ -43,54 +41,40 @@ class JobService:
         error_message: str = None,
     ) -> None:
         """Update job status."""
-        from sqlalchemy import select
+        # Write only the changed columns; the job row is never loaded
+        values = {"status": status}
         
-        result = await self.db.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            return
-        
-        job.status = status
-        
-        if status == JobStatus.RUNNING and not job.started_at:
-            job.started_at = datetime.utcnow()
+        if status == JobStatus.RUNNING:
+            values["started_at"] = func.coalesce(Job.started_at, datetime.utcnow())
         
         if status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-            job.completed_at = datetime.utcnow()
+            values["completed_at"] = datetime.utcnow()
         
         if error_message:
-            job.error_message = error_message
+            values["error_message"] = error_message
+        
+        updated = await self.db.scalar(
+            update(Job).where(Job.id == job_id).values(**values).returning(Job.id)
+        )
+        
+        if updated is None:
+            return
         
         if event:
-            job.timeline = job.timeline + [{
-                "timestamp": datetime.utcnow().isoformat(),
-                "event": event,
-            }]
+            self.db.add(TimelineEvent(job_id=job_id, event=event))
         
         await self.db.commit()
     
     async def add_timeline_event(self, job_id: UUID, event: str) -> None:
         """Add event to job timeline."""
-        from sqlalchemy import select
-        
-        result = await self.db.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if job:
-            job.timeline = job.timeline + [{
-                "timestamp": datetime.utcnow().isoformat(),
-                "event": event,
-            }]
-            await self.db.commit()
+        self.db.add(TimelineEvent(job_id=job_id, event=event))
+        await self.db.commit()
     
     async def increment_commands(self, job_id: UUID) -> None:
         """Increment executed commands counter."""
-        from sqlalchemy import select
-        
-        result = await self.db.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if job:
-            job.commands_executed += 1
-            await self.db.commit()
+        await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(commands_executed=Job.commands_executed + 1)
+        )
+        await self.db.commit()
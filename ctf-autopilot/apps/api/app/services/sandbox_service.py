@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from uuid import UUID
@@ -493,3 +494,12 @@ python3 /script/solve.py
             "sympy",
             "gmpy2",
         ]
+
+
+@lru_cache(maxsize=1)
+def get_sandbox_service() -> SandboxService:
+    """Process-wide SandboxService, so the docker client and tool cache are shared.
+    
+    Built on first use rather than at import, since it connects to docker.
+    """
+    return SandboxService()
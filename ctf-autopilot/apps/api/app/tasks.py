@@ -1,5 +1,5 @@
 from celery import Celery
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.orm import Session
 from pathlib import Path
 from uuid import UUID
@@ -130,17 +130,22 @@ async def _run_analysis(job_id: str):
                 job.flag_format,
             )
             
-            # Save candidates to database
-            for candidate in candidates:
-                flag = FlagCandidate(
-                    job_id=job_uuid,
-                    value=candidate["value"],
-                    confidence=candidate["confidence"],
-                    source=candidate["source"],
-                    evidence_id=candidate.get("evidence_id"),
-                    context=candidate.get("context"),
+            # Save candidates to database in one executemany batch
+            if candidates:
+                await db.execute(
+                    insert(FlagCandidate),
+                    [
+                        {
+                            "job_id": job_uuid,
+                            "value": candidate["value"],
+                            "confidence": candidate["confidence"],
+                            "source": candidate["source"],
+                            "evidence_id": candidate.get("evidence_id"),
+                            "context": candidate.get("context"),
+                        }
+                        for candidate in candidates
+                    ],
                 )
-                db.add(flag)
             
             await db.commit()
             
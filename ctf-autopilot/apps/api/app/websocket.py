@@ -1,9 +1,10 @@
 """WebSocket manager for real-time job updates."""
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
-import json
+from typing import Dict, Iterable, List, Set
 import asyncio
 
+import orjson
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates."""
@@ -46,33 +47,34 @@ class ConnectionManager:
                     del self.job_connections[job_id]
         print(f"[WS] Client disconnected from job {job_id}")
     
+    @staticmethod
+    async def _send_all(clients: Iterable[WebSocket], message: str) -> List[WebSocket]:
+        """Send one pre-encoded message to every client concurrently; return the failures."""
+        clients = list(clients)
+        results = await asyncio.gather(
+            *(ws.send_text(message) for ws in clients), return_exceptions=True
+        )
+        return [ws for ws, r in zip(clients, results) if isinstance(r, Exception)]
+    
     async def broadcast_job_update(self, job_id: str, data: dict):
         """Send job update to all connected clients."""
-        message = json.dumps({
+        # Encoded once and shared by every recipient
+        message = orjson.dumps({
             "type": "job_update",
             "job_id": job_id,
             "data": data,
-        })
+        }).decode()
         
-        disconnected = []
-        
-        # Send to job-specific connections
         async with self._lock:
             job_clients = list(self.job_connections.get(job_id, set()))
             global_clients = list(self.global_connections)
         
-        for websocket in job_clients:
-            try:
-                await websocket.send_text(message)
-            except Exception:
-                disconnected.append(("job", job_id, websocket))
-        
-        # Send to global connections
-        for websocket in global_clients:
-            try:
-                await websocket.send_text(message)
-            except Exception:
-                disconnected.append(("global", None, websocket))
+        failed_job, failed_global = await asyncio.gather(
+            self._send_all(job_clients, message),
+            self._send_all(global_clients, message),
+        )
+        disconnected = [("job", job_id, ws) for ws in failed_job]
+        disconnected += [("global", None, ws) for ws in failed_global]
         
         # Clean up disconnected clients
         for conn_type, jid, ws in disconnected:
@@ -99,23 +101,19 @@ class ConnectionManager:
     
     async def broadcast_job_log(self, job_id: str, log_entry: str, level: str = "info"):
         """Broadcast a log entry for a job."""
-        message = json.dumps({
+        message = orjson.dumps({
             "type": "job_log",
             "job_id": job_id,
             "data": {
                 "level": level,
                 "message": log_entry,
             },
-        })
+        }).decode()
         
         async with self._lock:
             job_clients = list(self.job_connections.get(job_id, set()))
         
-        for websocket in job_clients:
-            try:
-                await websocket.send_text(message)
-            except Exception:
-                pass
+        await self._send_all(job_clients, message)
     
     async def broadcast_job_complete(
         self, 
@@ -106,3 +106,127 @@ class TestPasswordSecurity:
         # This is validated through code review
         # The password should only be compared, never logged
         pass
+
+
+class TestSessionCache:
+    """Tests for the in-process session lookup cache."""
+    
+    class FailingDB:
+        async def execute(self, *args, **kwargs):
+            raise AssertionError("DB should not be queried")
+    
+    def test_cached_session_skips_db(self):
+        """A cached session should be returned without querying the DB."""
+        import asyncio
+        from datetime import datetime, timedelta
+        from app.routers import auth
+        
+        cached = auth.CachedSession("cached-id", datetime.utcnow() + timedelta(minutes=5))
+        auth._session_cache["cached-id"] = cached
+        try:
+            result = asyncio.run(auth.get_current_session("cached-id", self.FailingDB()))
+            assert result is cached
+        finally:
+            auth._session_cache.pop("cached-id", None)
+    
+    def test_expired_session_evicted(self):
+        """An expired cached session should be rejected and dropped."""
+        import asyncio
+        from datetime import datetime, timedelta
+        from fastapi import HTTPException
+        from app.routers import auth
+        
+        auth._session_cache["old-id"] = auth.CachedSession("old-id", datetime.utcnow() - timedelta(seconds=1))
+        with pytest.raises(HTTPException):
+            asyncio.run(auth.get_current_session("old-id", self.FailingDB()))
+        assert "old-id" not in auth._session_cache
+
+
+class TestPasswordHash:
+    """Tests for Argon2-hashed admin passwords."""
+    
+    def test_verify_against_hash(self, monkeypatch):
+        """ADMIN_PASSWORD_HASH should take precedence and be cached."""
+        from argon2 import PasswordHasher
+        from app.routers import auth
+        
+        monkeypatch.setattr(settings, "admin_password_hash", PasswordHasher().hash("s3cret"))
+        auth._password_verify_cache.clear()
+        
+        assert auth.verify_password("s3cret")
+        assert not auth.verify_password(settings.admin_password)
+        assert len(auth._password_verify_cache) == 2
+
+
+class TestCsrfToken:
+    """Tests for double-submit CSRF tokens."""
+    
+    def test_csrf_token_derived_from_session(self, monkeypatch):
+        """With SECRET_KEY set, CSRF tokens should be verifiable from the session id alone."""
+        from datetime import datetime
+        from fastapi import HTTPException
+        from app.routers import auth
+        
+        monkeypatch.setattr(settings, "secret_key", "test-secret")
+        monkeypatch.setitem(settings.__dict__, "effective_secret_key", "test-secret")
+        session = auth.CachedSession("sid", datetime.utcnow())
+        assert auth._new_csrf_token("sid") == auth._csrf_for("sid")
+        assert auth.verify_csrf(session, auth._csrf_for("sid"))
+        with pytest.raises(HTTPException):
+            auth.verify_csrf(session, auth._csrf_for("other"))
+    
+    def test_csrf_token_stored_without_secret_key(self, monkeypatch):
+        """Without SECRET_KEY, the token stored on the session should be checked."""
+        from datetime import datetime
+        from fastapi import HTTPException
+        from app.routers import auth
+        
+        monkeypatch.setattr(settings, "secret_key", None)
+        token = auth._new_csrf_token("sid")
+        session = auth.CachedSession("sid", datetime.utcnow(), token)
+        assert auth.verify_csrf(session, token)
+        with pytest.raises(HTTPException):
+            auth.verify_csrf(session, auth._csrf_for("sid"))
+        with pytest.raises(HTTPException):
+            auth.verify_csrf(auth.CachedSession("sid", datetime.utcnow()), "")
+
+
+class TestMeCaching:
+    """Tests for /api/auth/me HTTP caching."""
+    
+    def setup_method(self):
+        self.client = TestClient(app)
+    
+    def test_me_revalidates_per_cookie(self):
+        """/me must vary on the cookie and never be reused without revalidation."""
+        response = self.client.get("/api/auth/me")
+        
+        assert response.status_code == 200
+        assert response.headers["vary"] == "Cookie"
+        assert "no-cache" in response.headers["cache-control"]
+        
+        cached = self.client.get(
+            "/api/auth/me", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+    
+    def test_me_etag_changes_with_session(self):
+        """A different session must not match the previous ETag."""
+        from datetime import datetime, timedelta
+        from app.routers import auth
+        
+        auth._session_cache["sid-a"] = auth.CachedSession(
+            "sid-a", datetime.utcnow() + timedelta(hours=1)
+        )
+        try:
+            anonymous = self.client.get("/api/auth/me")
+            self.client.cookies.set("session_id", "sid-a")
+            with_session = self.client.get(
+                "/api/auth/me", headers={"If-None-Match": anonymous.headers["etag"]}
+            )
+        finally:
+            auth._session_cache.pop("sid-a", None)
+        
+        assert with_session.status_code == 200
+        assert with_session.headers["etag"] != anonymous.headers["etag"]
@@ -0,0 +1,54 @@
+import pytest
+
+from app.config import Settings
+
+
+class TestCorsOrigins:
+    """Tests for CORS_ORIGINS parsing."""
+    
+    @pytest.mark.parametrize("raw", ["", "*", "  *  "])
+    def test_wildcard(self, raw):
+        """Empty or '*' should allow all origins."""
+        assert Settings(CORS_ORIGINS=raw).cors_origins == ["*"]
+    
+    def test_json_array(self):
+        """JSON arrays should be parsed."""
+        settings = Settings(CORS_ORIGINS='["http://a", " http://b ", ""]')
+        assert settings.cors_origins == ["http://a", "http://b"]
+    
+    def test_csv(self):
+        """Comma-separated values should be parsed."""
+        settings = Settings(CORS_ORIGINS="http://a, http://b,")
+        assert settings.cors_origins == ["http://a", "http://b"]
+    
+    def test_invalid_json_falls_back_to_csv(self):
+        """Malformed JSON should be treated as CSV."""
+        assert Settings(CORS_ORIGINS="[http://a").cors_origins == ["[http://a"]
+
+
+class TestAllowedExtensions:
+    """Tests for allowed_extensions tokenization."""
+    
+    def test_normalized_set(self):
+        """Extensions should be lowercased, dot-prefixed and deduplicated."""
+        settings = Settings(allowed_extensions=".TXT, py,,.txt , .Zip")
+        assert settings.allowed_extensions_set == frozenset({".txt", ".py", ".zip"})
+
+
+class TestDotenvParsing:
+    """Tests for the cached .env reader in app.main."""
+    
+    def test_parse_and_reload_on_change(self, tmp_path):
+        """Comments are skipped, first key wins, and edits are picked up."""
+        import os
+        from app.main import _parse_dotenv_file
+        
+        path = tmp_path / ".env"
+        path.write_text('# comment\nCORS_ORIGINS="http://a"\nCORS_ORIGINS=http://b\n')
+        st = os.stat(path)
+        assert _parse_dotenv_file(str(path), st.st_mtime_ns) == {"CORS_ORIGINS": "http://a"}
+        
+        path.write_text("CORS_ORIGINS=http://c\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        st = os.stat(path)
+        assert _parse_dotenv_file(str(path), st.st_mtime_ns) == {"CORS_ORIGINS": "http://c"}
@@ -0,0 +1,59 @@
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.database import Base, sync_backfill_timeline, sync_create_schema
+from app.models import Job
+
+
+class TestTimelineBackfill:
+    """Tests for moving the legacy jobs.timeline JSON into timeline_events."""
+    
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            # Column left behind by databases created before timeline_events
+            conn.execute(text("ALTER TABLE jobs ADD COLUMN timeline JSON"))
+    
+    def _insert_legacy_job(self, timeline) -> uuid.UUID:
+        job_id = uuid.uuid4()
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO jobs (id, title, description, created_at, timeline) "
+                    "VALUES (:id, 'legacy', 'desc', :created_at, :timeline)"
+                ),
+                {
+                    "id": job_id.hex,
+                    "created_at": datetime(2025, 1, 1),
+                    "timeline": json.dumps(timeline),
+                },
+            )
+        return job_id
+    
+    def test_legacy_timeline_is_loaded_after_upgrade(self):
+        """A job's old JSON timeline should show up on Job.timeline."""
+        job_id = self._insert_legacy_job([
+            {"timestamp": "2025-01-01T10:00:00", "event": "Job created"},
+            {"timestamp": "2025-01-01T10:05:00", "event": "Analysis started"},
+        ])
+        
+        with self.engine.begin() as conn:
+            sync_create_schema(conn)
+        
+        with Session(self.engine) as session:
+            job = session.get(Job, job_id)
+            assert [e.event for e in job.timeline] == ["Job created", "Analysis started"]
+            assert job.timeline[1].timestamp == datetime(2025, 1, 1, 10, 5)
+    
+    def test_backfill_runs_once(self):
+        """Re-running the backfill should not duplicate events."""
+        self._insert_legacy_job([{"timestamp": "bad", "event": "Job created"}])
+        
+        with self.engine.begin() as conn:
+            assert sync_backfill_timeline(conn) == 1
+            assert sync_backfill_timeline(conn) == 0
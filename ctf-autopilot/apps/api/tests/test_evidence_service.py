@@ -140,3 +140,11 @@ class TestRegexPatterns:
                 description="Test description",
                 flag_format="[invalid(pattern",
             )
+    
+    def test_flag_pattern_compiled_once(self):
+        """Flag regexes should be compiled once and reused."""
+        from app.services.evidence_service import compiled_flag_pattern
+        
+        assert compiled_flag_pattern(r"XYZ\{[^}]+\}") is compiled_flag_pattern(r"XYZ\{[^}]+\}")
+        with pytest.raises(re.error):
+            compiled_flag_pattern(r"XYZ\{[")
@@ -63,9 +63,83 @@ class TestFileService:
         from app.config import settings
         
         # These should be in the allowed list
-        assert ".txt" in settings.allowed_extensions_list
-        assert ".py" in settings.allowed_extensions_list
-        assert ".zip" in settings.allowed_extensions_list
+        assert ".txt" in settings.allowed_extensions_set
+        assert ".py" in settings.allowed_extensions_set
+        assert ".zip" in settings.allowed_extensions_set
+    
+    def test_iter_zip_roundtrip(self):
+        """Streamed bundles should be valid zips with relative paths."""
+        import io
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "sub").mkdir()
+            (root / "a.txt").write_text("hello")
+            (root / "c.PNG").write_bytes(b"png" * 100)
+            (root / "sub" / "b.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+            
+            data = b"".join(self.service.iter_zip(root))
+            
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                assert zf.testzip() is None
+                assert sorted(zf.namelist()) == ["a.txt", "c.PNG", "sub/b.bin"]
+                assert zf.read("a.txt") == b"hello"
+                assert zf.getinfo("a.txt").compress_type == zipfile.ZIP_DEFLATED
+                assert zf.getinfo("c.PNG").compress_type == zipfile.ZIP_STORED
+                assert zf.read("sub/b.bin") == (root / "sub" / "b.bin").read_bytes()
+    
+    def test_iter_zip_skips_symlinks(self):
+        """Bundles should not follow symlinks out of the job directory."""
+        import io
+        
+        with tempfile.TemporaryDirectory() as outside, tempfile.TemporaryDirectory() as tmpdir:
+            (Path(outside) / "secret.txt").write_text("nope")
+            root = Path(tmpdir)
+            (root / "a.txt").write_text("hello")
+            (root / "link.txt").symlink_to(Path(outside) / "secret.txt")
+            (root / "linkdir").symlink_to(outside)
+            
+            data = b"".join(self.service.iter_zip(root))
+            
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                assert zf.namelist() == ["a.txt"]
+    
+    def test_save_files_duplicate_name_last_wins(self, monkeypatch):
+        """Uploads sharing a name should deterministically keep the last one."""
+        import asyncio
+        import io
+        import uuid
+        from fastapi import UploadFile
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # runs_dir is a cached_property, so patch the job dir directly
+            monkeypatch.setattr(self.service, "get_job_dir", lambda job_id: Path(tmpdir) / str(job_id))
+            files = [
+                UploadFile(io.BytesIO(b"first"), filename="notes.txt"),
+                UploadFile(io.BytesIO(b"other"), filename="b.txt"),
+                UploadFile(io.BytesIO(b"second"), filename="notes.txt"),
+            ]
+            job_id = uuid.uuid4()
+            
+            names = asyncio.run(self.service.save_files(job_id, files))
+            
+            input_dir = self.service.get_job_dir(job_id) / "input"
+            assert names == ["notes.txt", "b.txt", "notes.txt"]
+            assert (input_dir / "notes.txt").read_bytes() == b"second"
+            assert (input_dir / "b.txt").read_bytes() == b"other"
+    
+    def test_validate_file_rejects_oversized_upload(self, monkeypatch):
+        """Oversized uploads should be rejected while streaming the size check."""
+        import asyncio
+        import io
+        from fastapi import UploadFile
+        from app.config import settings
+        
+        monkeypatch.setattr(settings, "max_upload_size_mb", 1)
+        upload = UploadFile(io.BytesIO(b"x" * (1024 * 1024 + 1)), filename="big.txt")
+        
+        with pytest.raises(ValueError, match="too large"):
+            asyncio.run(self.service.validate_file(upload))
 
 
 class TestPathSanitization:
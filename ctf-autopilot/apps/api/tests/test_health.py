@@ -0,0 +1,40 @@
+import asyncio
+
+from app import main
+
+
+class TestReadinessCache:
+    """Tests for the /api/health/ready DB ping cache."""
+    
+    def setup_method(self):
+        self.pings = 0
+        main._last_ready = (0.0, "")
+    
+    def teardown_method(self):
+        main._last_ready = (0.0, "")
+    
+    async def _fake_ping(self):
+        self.pings += 1
+    
+    def test_repeated_probes_share_one_ping(self, monkeypatch):
+        """Probes within the TTL should reuse the last DB ping."""
+        monkeypatch.setattr(main, "_db_ready", True)
+        monkeypatch.setattr(main, "_wait_for_db", self._fake_ping)
+        
+        async def probe():
+            return [await main.readiness_check() for _ in range(3)]
+        
+        results = asyncio.run(probe())
+        
+        assert self.pings == 1
+        assert all(r["status"] == "ready" for r in results)
+    
+    def test_initializing_skips_ping(self, monkeypatch):
+        """Before DB init finishes, readiness should not touch the DB."""
+        monkeypatch.setattr(main, "_db_ready", False)
+        monkeypatch.setattr(main, "_wait_for_db", self._fake_ping)
+        
+        result = asyncio.run(main.readiness_check())
+        
+        assert self.pings == 0
+        assert result["status"] == "initializing"
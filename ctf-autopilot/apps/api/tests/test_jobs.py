@@ -0,0 +1,134 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Command, Job, JobStatus
+from app.routers import jobs
+from app.routers.jobs import list_jobs
+
+
+class _AwaitableSession:
+    """Just enough of AsyncSession for the jobs router, over a sync SQLite session."""
+    
+    def __init__(self, session: Session):
+        self._session = session
+        self.closed = False
+    
+    async def execute(self, statement):
+        return self._session.execute(statement)
+    
+    async def stream_scalars(self, statement):
+        async def rows():
+            for row in self._session.scalars(statement):
+                yield row
+        
+        return rows()
+    
+    async def close(self):
+        self.closed = True
+
+
+class TestListJobsPaging:
+    """Tests for keyset paging in GET /api/jobs."""
+    
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        start = datetime(2025, 1, 1)
+        with Session(self.engine) as session:
+            session.add_all(
+                Job(
+                    id=uuid.uuid4(),
+                    title=f"job {i}",
+                    description="",
+                    status=JobStatus.COMPLETED if i % 2 else JobStatus.PENDING,
+                    created_at=start + timedelta(minutes=i),
+                )
+                for i in range(5)
+            )
+            session.commit()
+    
+    def _page(self, **params):
+        params = {"status": None, "limit": 2, "offset": 0, "cursor": None, "include_total": True, **params}
+        
+        async def run():
+            with Session(self.engine) as session:
+                return await list_jobs(db=_AwaitableSession(session), _session=None, **params)
+        
+        return asyncio.run(run())
+    
+    def test_cursor_pages_keep_full_total(self):
+        """Every cursor page should report the same filtered total."""
+        pages = [self._page()]
+        while pages[-1].next_cursor:
+            pages.append(self._page(cursor=pages[-1].next_cursor))
+        
+        titles = [job.title for page in pages for job in page.jobs]
+        assert titles == ["job 4", "job 3", "job 2", "job 1", "job 0"]
+        assert [page.total for page in pages] == [5, 5, 5]
+        assert [page.has_more for page in pages] == [True, True, False]
+    
+    def test_cursor_total_respects_status(self):
+        """The cursor total should still apply the status filter."""
+        first = self._page(status=JobStatus.PENDING)
+        second = self._page(status=JobStatus.PENDING, cursor=first.next_cursor)
+        
+        assert [job.title for job in second.jobs] == ["job 0"]
+        assert first.total == second.total == 3
+
+
+class TestGetCommands:
+    """Tests for the streamed GET /api/jobs/{id}/commands body."""
+    
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.job_id = uuid.uuid4()
+        start = datetime(2025, 1, 1)
+        with Session(self.engine) as session:
+            session.add(Job(id=self.job_id, title="job", description=""))
+            session.add_all(
+                Command(
+                    id=f"cmd-{i}",
+                    job_id=self.job_id,
+                    tool="file",
+                    arguments=["a.bin"],
+                    exit_code=0,
+                    started_at=start + timedelta(seconds=i),
+                )
+                for i in range(3)
+            )
+            session.commit()
+    
+    def test_commands_streamed_as_list(self, monkeypatch):
+        """The streamed body should be a complete CommandListResponse."""
+        session = _AwaitableSession(Session(self.engine))
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", lambda: session)
+        
+        async def run():
+            response = await jobs.get_commands(job_id=self.job_id, _session=None)
+            return b"".join([chunk async for chunk in response.body_iterator])
+        
+        body = json.loads(asyncio.run(run()))
+        assert [c["arguments"] for c in body["commands"]] == [["a.bin"]] * 3
+        assert session.closed
+    
+    def test_query_error_raised_before_streaming(self, monkeypatch):
+        """DB errors should fail the request instead of truncating a 200 body."""
+        session = _AwaitableSession(Session(self.engine))
+        
+        async def broken(statement):
+            raise ConnectionError("db down")
+        
+        session.stream_scalars = broken
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", lambda: session)
+        
+        with pytest.raises(ConnectionError):
+            asyncio.run(jobs.get_commands(job_id=self.job_id, _session=None))
+        assert session.closed
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware.cors import FastCORSMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.security import SecurityHeadersMiddleware
+
+
+def _make_app(**cors_kwargs) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    
+    app.add_middleware(FastCORSMiddleware, allow_methods=["GET"], **cors_kwargs)
+    return app
+
+
+class TestFastCORSMiddleware:
+    """Tests for the frozenset-backed CORS allowlist."""
+    
+    def test_exact_allowlist(self):
+        """Only listed origins should be echoed back."""
+        client = TestClient(_make_app(allow_origins=["http://a.test"], allow_credentials=True))
+        
+        allowed = client.get("/ping", headers={"Origin": "http://a.test"})
+        denied = client.get("/ping", headers={"Origin": "http://b.test"})
+        
+        assert allowed.headers["access-control-allow-origin"] == "http://a.test"
+        assert "access-control-allow-origin" not in denied.headers
+    
+    @pytest.mark.parametrize("kwargs", [
+        {"allow_origins": ["*"]},
+        {"allow_origin_regex": r"http://.*\.test"},
+    ])
+    def test_wildcard_and_regex_fall_back(self, kwargs):
+        """Wildcard and regex configurations keep Starlette's behaviour."""
+        client = TestClient(_make_app(**kwargs))
+        
+        response = client.get("/ping", headers={"Origin": "http://c.test"})
+        
+        assert "access-control-allow-origin" in response.headers
+
+
+class TestRateLimitMiddleware:
+    """Tests for the per-client sliding window limiter."""
+    
+    def setup_method(self):
+        app = FastAPI()
+        
+        @app.post("/api/auth/login")
+        async def login():
+            return {"ok": True}
+        
+        @app.get("/api/other")
+        async def other(request: Request):
+            return {"client_ip": request.state.client_ip}
+        
+        app.add_middleware(RateLimitMiddleware)
+        self.client = TestClient(app)
+    
+    def test_login_limit(self):
+        """Login should be limited to 5 requests per minute."""
+        statuses = [self.client.post("/api/auth/login").status_code for _ in range(6)]
+        
+        assert statuses[:5] == [200] * 5
+        assert statuses[5] == 429
+    
+    def test_limit_is_per_path(self):
+        """Exhausting one path should not limit another."""
+        for _ in range(6):
+            self.client.post("/api/auth/login")
+        
+        assert self.client.get("/api/other").status_code == 200
+    
+    def test_limit_is_per_client(self):
+        """Different forwarded client IPs should have separate windows."""
+        for _ in range(5):
+            self.client.post("/api/auth/login", headers={"X-Forwarded-For": "10.0.0.1"})
+        
+        blocked = self.client.post("/api/auth/login", headers={"X-Forwarded-For": "10.0.0.1"})
+        other = self.client.post("/api/auth/login", headers={"X-Forwarded-For": "10.0.0.2, 10.0.0.1"})
+        
+        assert blocked.status_code == 429
+        assert other.status_code == 200
+    
+    def test_sweep_drops_idle_clients(self):
+        """Keys whose window has fully expired should be removed."""
+        limiter = RateLimitMiddleware(app=None)
+        now = time.monotonic()
+        limiter.requests[("10.0.0.1", "/idle")].append(now - 120)
+        limiter.requests[("10.0.0.1", "/active")].append(now)
+        
+        limiter._sweep(now - limiter.WINDOW_SECONDS)
+        
+        assert list(limiter.requests) == [("10.0.0.1", "/active")]
+    
+    def test_client_ip_shared_via_request_state(self):
+        """The resolved client IP should be available to handlers."""
+        response = self.client.get("/api/other", headers={"X-Forwarded-For": "10.0.0.9, 10.0.0.1"})
+        
+        assert response.json() == {"client_ip": "10.0.0.9"}
+
+
+class TestSecurityHeadersMiddleware:
+    """Tests for the precomputed security headers."""
+    
+    def test_headers_applied(self):
+        """Every response should carry the static security headers."""
+        app = FastAPI()
+        
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+        
+        app.add_middleware(SecurityHeadersMiddleware)
+        response = TestClient(app).get("/ping")
+        
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert "frame-ancestors 'none'" in response.headers["Content-Security-Policy"]
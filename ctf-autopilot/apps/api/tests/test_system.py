@@ -0,0 +1,76 @@
+import asyncio
+import os
+import subprocess
+
+from app.routers import system
+
+
+class TestCheckUpdateCache:
+    """Tests for the /system/check-update result cache."""
+    
+    def setup_method(self):
+        self.calls = 0
+        system._last_update_check = (0.0, None)
+        system._update_check_lock = asyncio.Lock()
+    
+    def teardown_method(self):
+        system._last_update_check = (0.0, None)
+    
+    async def _fake_check(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {
+            "updates_available": False,
+            "current_version": "abc1234",
+            "latest_version": "abc1234",
+            "commits_behind": 0,
+            "error": None,
+        }
+    
+    def test_concurrent_misses_share_one_check(self, monkeypatch):
+        """Concurrent polls on a cold cache should run git only once."""
+        monkeypatch.setattr(system, "_check_for_updates", self._fake_check)
+        
+        async def poll():
+            return await asyncio.gather(*(system.check_update() for _ in range(5)))
+        
+        results = asyncio.run(poll())
+        
+        assert self.calls == 1
+        assert all(r.current_version == "abc1234" for r in results)
+    
+    def test_force_bypasses_cache(self, monkeypatch):
+        """force=true should always re-check."""
+        monkeypatch.setattr(system, "_check_for_updates", self._fake_check)
+        
+        async def poll():
+            await system.check_update()
+            await system.check_update()
+            await system.check_update(force=True)
+        
+        asyncio.run(poll())
+        
+        assert self.calls == 2
+
+
+class TestCheckForUpdates:
+    """Tests for the git probe behind /system/check-update."""
+    
+    def test_unreachable_remote_reports_error(self, monkeypatch, tmp_path):
+        """A failing ls-remote should surface as an error, not as up to date."""
+        env = {
+            "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t",
+            "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t",
+        }
+        for args in (
+            ["init", "-q"],
+            ["commit", "-q", "--allow-empty", "-m", "init"],
+            ["remote", "add", "origin", str(tmp_path / "missing")],
+        ):
+            subprocess.run(["git", *args], cwd=tmp_path, check=True, env={**os.environ, **env})
+        monkeypatch.setattr(system, "_find_install_dir", lambda: str(tmp_path))
+        
+        result = asyncio.run(system._check_for_updates())
+        
+        assert result["error"].startswith("Could not reach update remote")
+        assert result["updates_available"] is False
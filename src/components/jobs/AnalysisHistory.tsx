@@ -216,7 +216,7 @@ export function AnalysisHistory({
     }
   };
 
-  const formatDuration = (startedAt: string, endedAt: string | null) => {
+  const formatDuration = (startedAt: string, endedAt?: string | null) => {
     if (!endedAt) return 'In progress';
     const start = new Date(startedAt).getTime();
     const end = new Date(endedAt).getTime();
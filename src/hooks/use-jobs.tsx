@@ -311,7 +311,7 @@ export function useJobDetail(jobId: string) {
     setError(null);
 
     try {
-      const detail = await api.getJob(jobId);
+      const detail = await api.getJob(jobId, true);
       const commands = await api.getJobCommands(jobId);
       const artifacts = await api.getJobArtifacts(jobId);
 
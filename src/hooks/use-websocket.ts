@@ -68,7 +68,6 @@ export function useJobWebSocket(options: UseWebSocketOptions = {}): UseWebSocket
   
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
-  const pingIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
   const prevStatusRef = useRef<Map<string, string>>(new Map());
 
   // Get notification functions - will be null if not wrapped in provider
@@ -88,10 +87,6 @@ export function useJobWebSocket(options: UseWebSocketOptions = {}): UseWebSocket
   }, [jobId]);
 
   const cleanup = useCallback(() => {
-    if (pingIntervalRef.current) {
-      clearInterval(pingIntervalRef.current);
-      pingIntervalRef.current = null;
-    }
     if (reconnectTimeoutRef.current) {
       clearTimeout(reconnectTimeoutRef.current);
       reconnectTimeoutRef.current = null;
@@ -166,20 +161,10 @@ export function useJobWebSocket(options: UseWebSocketOptions = {}): UseWebSocket
         console.log('[WS] Connected');
         setIsConnected(true);
         setError(null);
-        
-        // Start ping interval to keep connection alive
-        pingIntervalRef.current = setInterval(() => {
-          if (ws.readyState === WebSocket.OPEN) {
-            ws.send('ping');
-          }
-        }, 30000);
+        // Keep-alive is handled by protocol-level Ping/Pong frames from the server
       };
 
       ws.onmessage = (event) => {
-        if (event.data === 'pong') {
-          return; // Ignore pong responses
-        }
-        
         try {
           const message = JSON.parse(event.data) as JobUpdate;
           console.log('[WS] Received:', message);
@@ -200,11 +185,6 @@ export function useJobWebSocket(options: UseWebSocketOptions = {}): UseWebSocket
         console.log('[WS] Disconnected:', event.code, event.reason);
         setIsConnected(false);
         
-        if (pingIntervalRef.current) {
-          clearInterval(pingIntervalRef.current);
-          pingIntervalRef.current = null;
-        }
-        
         // Auto reconnect if enabled and not a normal close
         if (autoReconnect && event.code !== 1000) {
           console.log(`[WS] Reconnecting in ${reconnectInterval}ms...`);
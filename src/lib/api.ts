@@ -197,9 +197,11 @@ export interface JobDetail extends Job {
 
 export interface JobListResponse {
   jobs: Job[];
-  total: number;
+  total?: number | null;
   limit: number;
   offset: number;
+  has_more: boolean;
+  next_cursor?: string | null;
 }
 
 export async function listJobs(
@@ -216,8 +218,9 @@ export async function listJobs(
   return apiFetch(`/jobs?${params}`);
 }
 
-export async function getJob(jobId: string): Promise<JobDetail> {
-  return apiFetch(`/jobs/${jobId}`);
+export async function getJob(jobId: string, includeFlags = false): Promise<JobDetail> {
+  // flag_candidates is only populated when requested
+  return apiFetch(`/jobs/${jobId}${includeFlags ? '?include=flags' : ''}`);
 }
 
 export async function createJob(
@@ -316,8 +319,8 @@ export interface UpdateCheckResponse {
   error?: string;
 }
 
-export async function checkForUpdates(): Promise<UpdateCheckResponse> {
-  return apiFetch('/system/check-update');
+export async function checkForUpdates(force = false): Promise<UpdateCheckResponse> {
+  return apiFetch(`/system/check-update${force ? '?force=true' : ''}`);
 }
 
 export async function performUpdate(): Promise<Response> {
@@ -524,24 +527,24 @@ export interface AnalysisSessionSummary {
   id: string;
   job_id: string;
   name: string;
-  strategy: string | null;
-  detected_category: string | null;
+  strategy?: string | null;
+  detected_category?: string | null;
   status: string;
   started_at: string;
-  ended_at: string | null;
+  ended_at?: string | null;
   total_commands: number;
   successful_commands: number;
   flags_found_count: number;
   ai_suggestions_used: number;
-  notes: string | null;
-  summary: string | null;
+  notes?: string | null;
+  summary?: string | null;
 }
 
 export interface CommandSummary {
   id: string;
   tool: string;
   arguments: string[];
-  exit_code: number | null;
+  exit_code?: number | null;
   stdout_preview: string;
   executed_at: string;
   duration_ms: number;
@@ -551,7 +554,7 @@ export interface FlagSummary {
   id: string;
   value: string;
   confidence: number;
-  source: string | null;
+  source?: string | null;
 }
 
 export interface SessionDetail {
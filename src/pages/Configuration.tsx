@@ -294,12 +294,12 @@ export default function Configuration() {
   };
   
   // Check for updates
-  const checkForUpdates = async () => {
+  const checkForUpdates = async (force = false) => {
     setUpdateStatus(prev => ({ ...prev, isChecking: true, error: null }));
     
     if (isBackendConnected) {
       try {
-        const data = await api.checkForUpdates();
+        const data = await api.checkForUpdates(force);
         setUpdateStatus(prev => ({
           ...prev,
           isChecking: false,
@@ -375,10 +375,16 @@ export default function Configuration() {
             if (done) break;
             
             buffer += decoder.decode(value, { stream: true });
-            const lines = buffer.split('\n');
-            buffer = lines.pop() || ''; // Keep incomplete line in buffer
+            const events = buffer.split('\n\n');
+            buffer = events.pop() || ''; // Keep incomplete event in buffer
             
-            for (const line of lines) {
+            for (const event of events) {
+              // SSE: join the data: lines; comment-only events are keep-alive pings
+              const line = event
+                .split('\n')
+                .filter(l => l.startsWith('data:'))
+                .map(l => l.slice(5).trimStart())
+                .join('\n');
               if (!line.trim()) continue;
               
               try {
@@ -424,12 +430,13 @@ export default function Configuration() {
           }
           
           // Process remaining buffer
-          if (buffer.trim()) {
+          const rest = buffer.replace(/^data:\s?/gm, '').trim();
+          if (rest && !rest.startsWith(':')) {
             try {
-              const data = JSON.parse(buffer);
-              addLog(data.message || buffer);
+              const data = JSON.parse(rest);
+              addLog(data.message || rest);
             } catch {
-              addLog(buffer);
+              addLog(rest);
             }
           }
           
@@ -687,7 +694,7 @@ export default function Configuration() {
                   <Button 
                     variant="outline" 
                     size="sm" 
-                    onClick={checkForUpdates}
+                    onClick={() => checkForUpdates(true)}
                     disabled={updateStatus.isChecking || updateStatus.isUpdating}
                   >
                     {updateStatus.isChecking ? (